@@ -3,9 +3,7 @@ from __future__ import annotations
 
 from enum import Enum
 import re
-from typing import TYPE_CHECKING, Self, overload
-
-import pygame
+from typing import TYPE_CHECKING, Generator, Iterable, Self, overload
 
 import src
 import src.theme
@@ -63,6 +61,10 @@ class Rank(int, Enum):
 		return self == self._1 if color else self == self._8
 
 
+FILES = tuple(File)
+RANKS = tuple(Rank)
+
+
 class vector(src.array,
 	dimension = 2,
 ):
@@ -76,8 +78,8 @@ class vector(src.array,
 		return self[1] << 3
 
 	@property
-	def pygame(self) -> pygame.Vector2:
-		return pygame.Vector2(self)
+	def step(self) -> int:  # offset on the 0x88 mailbox
+		return self[0] + (self[1] << 4)
 
 
 class Vector(vector, Enum,
@@ -147,7 +149,7 @@ class Vectors(src.collection[vector]):
 			case         _: return NotImplemented
 
 
-class square(int, src.theme.Highlightable):
+class square(int):
 
 	highlight_color: src.theme.RGB
 
@@ -155,73 +157,22 @@ class square(int, src.theme.Highlightable):
 	def __new__(cls, x: int, *_):
 		return super().__new__(cls, x)
 
-	def __init__(self, x: int, *args):
-		super().__init__(*args)
-
-		self.black = src.theme.BLACK
-		self.white = src.theme.WHITE
+	def __init__(self, x: int, *_):
+		super().__init__()
 
 
 	@property
 	def rank(self) -> Rank:
-		return Rank(self & 0o70)
+		return RANKS[self >> 3]
 
 	@property
 	def file(self) -> File:
-		return File(self & 0o07)
+		return FILES[self & 0o07]
 
 	@property
 	def color(self) -> Color:
 		return Color((((self.rank >> 3) + self.file & 1) << 1) - 1)
 
-	@property
-	def decal(self) -> str:
-		return self.__class__.__name__
-
-	@property
-	def rect(self) -> pygame.Rect:
-		return pygame.Rect(
-			pygame.Vector2(
-				src.theme.SQUARE_W * (self.file),
-				src.theme.SQUARE_H * (self.rank >> 3) + src.theme.BOARD_OFFSET * 11 // 12,
-			),
-			pygame.Vector2(*src.theme.SQUARE),
-		)
-
-
-	def clicked(self, event: pygame.event.Event) -> bool:
-		return event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos)
-
-	def draw(self, screen: pygame.Surface):
-		screen.fill(self.black if self.color else self.white, self.rect)
-
-		super().draw(screen,
-			special_flags = pygame.BLEND_RGBA_MULT,
-		)
-
-	def highlight(self, screen: pygame.Surface,
-		width: int = 1,
-		thick: int = 0,
-	):
-		rect = self.rect.inflate(
-			-self.rect.width  // (width + 1) * 24 // 25,
-			-self.rect.height // (width + 1) * 24 // 25,
-		).move(
-			+self.rect.width  // 100,
-			-self.rect.height // 100,
-		)
-		surf = pygame.Surface(rect.size,
-			flags = pygame.SRCALPHA,
-		)
-
-		pygame.draw.ellipse(surf, self.highlight_color, surf.get_rect(), thick)
-		screen.blit(surf, rect,
-			special_flags = pygame.BLEND_RGB_ADD,
-		)
-	#	screen.fill(self.highlight_color, self.rect,
-	#		special_flags = pygame.BLEND_RGB_ADD,
-	#	)
-
 
 class Square(square, Enum):
 
@@ -239,7 +190,12 @@ class Square(square, Enum):
 	def __repr__(self) -> str:
 		return self.name.lower()
 
-	def __add__(self, other: Vector) -> Square: return Square(File(self.file + other.file) + Rank(self.rank + other.rank))
+	def __add__(self, other: Vector) -> Square:
+		if (square := self.offset(other)) is None:
+			raise ValueError(f"{self!r} {other!r} leaves the board")
+
+		return square
+
 	def __sub__(self, other: Square) -> Vector: return Vector(     self.file - other.file,        self.rank - other.rank )
 
 	def __mul__(self, color: Color) -> Square:
@@ -254,6 +210,12 @@ class Square(square, Enum):
 	def __imul__(self, color: Color ) -> Square: return self * color
 
 
+	def offset(self, other: vector) -> Square | None:
+		index = MAILBOX[self] + other.step
+
+		return None if index & 0x88 else UNBOX[index]
+
+
 	@classmethod
 	def fromnotation(cls, notation: str) -> Self:
 		file, rank = notation
@@ -266,28 +228,133 @@ class Square(square, Enum):
 			yield cls(square)
 
 
-class Squares(src.collection[square]):
+#	0x88 mailbox: rank << 4 | file, so a step off the board sets a bit of 0x88
+MAILBOX = tuple(square + (square & 0o70) for square in range(0o100))
+UNBOX = tuple(None if index & 0x88 else Square(index + (index & 0o07) >> 1) for index in range(0x80))
+
+
+class Squares:
+
+	def __init__(self, *items: square):
+		self.mask = 0
+		self.slots: list[square | None] = [None] * 0o100
+
+		for item in items:
+			self.add(item)
+
+	def __repr__(self) -> str:
+		return f"{self.__class__.__name__}({', '.join(map(repr, self))})"
+
+	def __iter__(self) -> Generator[square]:
+		mask = self.mask
+		slots = self.slots
+
+		while mask:
+			low = mask & -mask
+			mask ^= low
+
+			yield slots[low.bit_length() - 1]  # type: ignore  # set bits always hold an item
+
+	def __len__(self) -> int:
+		return self.mask.bit_count()
+
+	def __bool__(self) -> bool:
+		return bool(self.mask)
 
-	def __add__(self, other: Vectors, /) -> Squares: return Squares(*(left + right for left in self for right in other))
+	def __contains__(self, item: int) -> bool:
+		return 0 <= item < 0o100 and bool(self.mask >> item & 1)
+
+	def __eq__(self, other: object) -> bool:
+		return isinstance(other, Squares) and self.mask == other.mask
+
+	__hash__ = None  # type: ignore  # mutable, like the set it replaces
+
+	def __add__(self, other: Vectors, /) -> Squares: return Squares(*(square for left in self for right in other if (square := Square(left).offset(right)) is not None))
 	def __mul__(self, color: Color  , /) -> Squares: return Squares(*(left * color for left in self))
 
+	def  __or__(self, other: Squares, /) -> Self: return self.               union(other)
+	def __and__(self, other: Squares, /) -> Self: return self.        intersection(other)
+	def __sub__(self, other: Squares, /) -> Self: return self.          difference(other)
+	def __xor__(self, other: Squares, /) -> Self: return self.symmetric_difference(other)
+
+	def  __ior__(self, other: Squares, /) -> Self: self.                     update(other); return self
+	def __iand__(self, other: Squares, /) -> Self: self.        intersection_update(other); return self
+	def __isub__(self, other: Squares, /) -> Self: self.          difference_update(other); return self
+	def __ixor__(self, other: Squares, /) -> Self: self.symmetric_difference_update(other); return self
+
+	def                union(self, *others: Squares) -> Self: copy = self.copy(); copy.                     update(*others); return copy
+	def         intersection(self, *others: Squares) -> Self: copy = self.copy(); copy.        intersection_update(*others); return copy
+	def           difference(self, *others: Squares) -> Self: copy = self.copy(); copy.          difference_update(*others); return copy
+	def symmetric_difference(self,  other : Squares) -> Self: copy = self.copy(); copy.symmetric_difference_update( other ); return copy
+
+
+	@classmethod
+	def any(cls, others: Iterable[Squares]) -> Self:
+		return cls().union(*others)
+
+	@classmethod
+	def all(cls, others: Iterable[Squares]) -> Self:
+		return cls().intersection(*others)
+
 
 	@property
-	def moves(self) -> Squares:
+	def moves(self) -> Self:
 		return self.filter(src.rules.Move)
 
 	@property
-	def capts(self) -> Squares:
+	def capts(self) -> Self:
 		return self.filter(src.rules.Capt)
 
 	@property
-	def specs(self) -> Squares:
+	def specs(self) -> Self:
 		return self.filter(src.rules.Mod)
 
 
-	def get(self, square: Square) -> src.rules.Move | None:
-		for rule in self:
-			if rule.target == square:
-				return rule
+	def add(self, item: square):
+		if not self.mask >> item & 1:
+			self.mask |= 1 << item
+			self.slots[item] = item
 
-		return None
+	def discard(self, item: square):
+		self.mask &= ~(1 << item)
+		self.slots[item] = None
+
+	def update(self, *others: Squares):
+		for other in others:
+			self.merge(other)
+			self.mask |= other.mask
+
+	def intersection_update(self, *others: Squares):
+		for other in others:
+			self.mask &= other.mask
+
+	def difference_update(self, *others: Squares):
+		for other in others:
+			self.mask &= ~other.mask
+
+	def symmetric_difference_update(self, other: Squares):
+		self.merge(other)
+		self.mask ^= other.mask
+
+	def merge(self, other: Squares):  # copy in the items of other on squares not held yet
+		fresh = other.mask & ~self.mask
+
+		while fresh:
+			low = fresh & -fresh
+			fresh ^= low
+
+			index = low.bit_length() - 1
+			self.slots[index] = other.slots[index]
+
+	def copy(self) -> Self:
+		copy = self.__class__()
+		copy.mask = self.mask
+		copy.slots = self.slots.copy()
+
+		return copy
+
+	def filter(self, by: type) -> Self:
+		return self.__class__(*(item for item in self if isinstance(item, by)))
+
+	def get(self, square: Square) -> src.rules.Move | None:
+		return self.slots[square] if self.mask >> square & 1 else None  # type: ignore  # rules sit on their targets
@@ -0,0 +1,569 @@
+from __future__ import annotations
+
+
+from array import array
+from enum import Enum
+from random import Random
+from typing import TYPE_CHECKING, Generator, Iterable
+
+import src.algebra
+
+if TYPE_CHECKING:
+	import src.material
+
+
+class Layer(int, Enum):
+
+	PAWN   = 0  # ♟ ♙
+	KNIGHT = 1  # ♞ ♘
+	BISHOP = 2  # ♝ ♗
+	ROOK   = 3  # ♜ ♖
+	QUEEN  = 4  # ♛ ♕
+	KING   = 5  # ♚ ♔
+	GHOST  = 6  # en-passant marker
+
+
+FULL = (1 << 64) - 1
+
+FILES = tuple(sum(1 << (rank << 3 | file) for rank in range(8)) for file in range(8))
+
+SQUARES = tuple(src.algebra.Square)
+
+
+def lands(step: int) -> int:
+	return sum(FILES[file] for file in range(8) if 0 <= file + step < 8)
+
+
+WRAPS = {step: lands(step) for step in range(-2, 3)}
+
+ROOK   = (src.algebra.Vector.N , src.algebra.Vector.E , src.algebra.Vector.S , src.algebra.Vector.W )
+BISHOP = (src.algebra.Vector.NE, src.algebra.Vector.SE, src.algebra.Vector.SW, src.algebra.Vector.NW)
+QUEEN  = ROOK + BISHOP
+KING   = QUEEN
+KNIGHT = (
+	src.algebra.Vector.N2E,
+	src.algebra.Vector.NE2,
+	src.algebra.Vector.SE2,
+	src.algebra.Vector.S2E,
+	src.algebra.Vector.S2W,
+	src.algebra.Vector.SW2,
+	src.algebra.Vector.NW2,
+	src.algebra.Vector.N2W,
+)
+PAWN = (
+	(src.algebra.Vector.NE, src.algebra.Vector.NW),  # ⬜
+	(src.algebra.Vector.SE, src.algebra.Vector.SW),  # ⬛
+)
+
+
+def shift(mask: int, vector: src.algebra.vector) -> int:
+	offset = vector.file + vector.rank
+	mask &= WRAPS[vector.file]
+
+	return (mask << offset if offset > 0 else mask >> -offset) & FULL
+
+
+def leap(mask: int, vectors: Iterable[src.algebra.vector]) -> int:
+	attacks = 0
+
+	for vector in vectors:
+		attacks |= shift(mask, vector)
+
+	return attacks
+
+def slide(mask: int, vectors: Iterable[src.algebra.vector], occupied: int) -> int:
+	attacks = 0
+
+	for vector in vectors:
+		ray = mask
+
+		while ray:
+			ray = shift(ray, vector)
+			attacks |= ray
+			ray &= ~occupied
+
+	return attacks
+
+
+KNIGHT_ATTACKS = tuple(leap(1 << square, KNIGHT) for square in range(64))
+KING_ATTACKS   = tuple(leap(1 << square, KING  ) for square in range(64))
+
+PAWN_ATTACKS = tuple(tuple(leap(1 << square,  PAWN[index]                            ) for square in range(64)) for index in range(2))
+PAWN_PUSHES  = tuple(tuple(leap(1 << square, (src.algebra.Vector.S * (index * 2 - 1),)) for square in range(64)) for index in range(2))
+
+LEAPS = {
+	Layer.KNIGHT: KNIGHT_ATTACKS,
+	Layer.KING  : KING_ATTACKS  ,
+}
+
+RAYS = {vector: tuple(slide(1 << square, (vector,), 0) for square in range(64)) for vector in QUEEN}
+
+type Rays = tuple[tuple[tuple[int, ...], bool], ...]
+
+BISHOP_RAYS: Rays = tuple((RAYS[vector], vector.file + vector.rank > 0) for vector in BISHOP)
+ROOK_RAYS  : Rays = tuple((RAYS[vector], vector.file + vector.rank > 0) for vector in ROOK  )
+QUEEN_RAYS : Rays = BISHOP_RAYS + ROOK_RAYS
+
+SLIDES = {
+	Layer.BISHOP: BISHOP_RAYS,
+	Layer.ROOK  : ROOK_RAYS  ,
+	Layer.QUEEN : QUEEN_RAYS ,
+}
+
+
+def sweep(square: int, rays: Rays, occupied: int) -> int:
+	attacks = 0
+
+	for table, ascending in rays:
+		ray = table[square]
+
+		if blockers := ray & occupied:
+			ray ^= table[(blockers & -blockers).bit_length() - 1 if ascending else blockers.bit_length() - 1]
+
+		attacks |= ray
+
+	return attacks
+
+
+def between(source: int, target: int) -> int:
+	for table, _ in QUEEN_RAYS:
+		if table[source] >> target & 1:
+			return table[source] & ~table[target] & ~(1 << target)
+
+	return 0
+
+
+BETWEEN = tuple(tuple(between(source, target) for target in range(64)) for source in range(64))
+
+
+zobrist = Random(0x600C4E55)
+
+KEYS = tuple(tuple(zobrist.getrandbits(64) for _ in range(64)) for _ in range(len(Layer) << 1))
+TURN = zobrist.getrandbits(64)
+CASTLES = tuple((zobrist.getrandbits(64), zobrist.getrandbits(64)) for _ in range(2))  # (a-rook, h-rook) for ⬜ ⬛
+
+
+#	packed move layout (low to high bits):
+#	source 6 | target 6 | flags 4
+QUIET      = 0
+RUSH       = 1
+HROOK      = 2  # castle with the h-file rook
+AROOK      = 3  # castle with the a-file rook
+CAPTURE    = 4
+EN_PASSANT = 5
+PROMOTION  = 8  # | CAPTURE | officer index (♛ ♜ ♞ ♝)
+
+
+def pack(source: int, target: int,
+	flags: int = QUIET,
+) -> int:
+	return source | target << 6 | flags << 12
+
+def notation(move: int) -> str:
+	source = SQUARES[move       & 0o77]
+	target = SQUARES[move >>  6 & 0o77]
+	flags = move >> 12
+
+	return repr(source) + repr(target) + ("qrnb"[flags & 3] if flags & PROMOTION else "")
+
+
+def squares(mask: int) -> Generator[src.algebra.Square]:
+	while mask:
+		low = mask & -mask
+		yield SQUARES[low.bit_length() - 1]
+		mask ^= low
+
+
+class Bitboards(list[int]):
+
+	def __init__(self):
+		super().__init__(0 for _ in range(len(Layer) << 1))
+
+		self.sides = [0, 0]  # ⬜ ⬛
+		self.key = 0
+
+		self.reach: list[int] = [0 for _ in range(64)]
+		self.maps: list[int | None] = [0, 0]  # ⬜ ⬛
+
+		self.guards: list[tuple[int, dict[int, int]] | None] = [None, None]  # ⬜ ⬛
+
+
+	def add(self, square: src.algebra.Square, piece: src.material.Piece | None):
+		if piece is None:
+			return
+
+		bit = 1 << square
+		layer = piece.layer << 1 | bool(piece.color)
+
+		if self[layer] & bit:
+			return
+
+		self[layer] |= bit
+		self.key ^= KEYS[layer][square]
+
+		if piece.layer != Layer.GHOST:
+			self.sides[bool(piece.color)] |= bit
+
+	def discard(self, square: src.algebra.Square, piece: src.material.Piece | None):
+		if piece is None:
+			return
+
+		bit = 1 << square
+		layer = piece.layer << 1 | bool(piece.color)
+
+		if not self[layer] & bit:
+			return
+
+		self[layer] ^= bit
+		self.key ^= KEYS[layer][square]
+
+		if piece.layer != Layer.GHOST:
+			self.sides[bool(piece.color)] ^= bit
+
+	def place(self, square: src.algebra.Square,
+		before: src.material.Piece | None,
+		after : src.material.Piece | None,
+	):
+		self.discard(square, before)
+		self.add    (square, after )
+
+		occupied = self.occupied
+
+		diagonal = self[Layer.BISHOP << 1] | self[Layer.BISHOP << 1 | 1] | self[Layer.QUEEN << 1] | self[Layer.QUEEN << 1 | 1]
+		straight = self[Layer.ROOK   << 1] | self[Layer.ROOK   << 1 | 1] | self[Layer.QUEEN << 1] | self[Layer.QUEEN << 1 | 1]
+
+		viewers = sweep(square, BISHOP_RAYS, occupied) & diagonal \
+			|     sweep(square, ROOK_RAYS  , occupied) & straight
+
+		self.reach[square] = self.attacks(square, occupied)
+
+		for viewer in squares(viewers):
+			self.reach[viewer] = self.attacks(viewer, occupied)
+
+		self.maps[0] = None
+		self.maps[1] = None
+
+		self.guards[0] = None
+		self.guards[1] = None
+
+
+	@property
+	def occupied(self) -> int:
+		return self.sides[0] | self.sides[1]
+
+
+	def pieces(self, layer: Layer, color: src.algebra.Color) -> int:
+		return self[layer << 1 | bool(color)]
+
+	def side(self, color: src.algebra.Color) -> int:
+		return self.sides[bool(color)]
+
+	def attacks(self, square: int, occupied: int) -> int:
+		bit = 1 << square
+
+		if not occupied & bit:
+			return 0
+
+		index = bool(self.sides[1] & bit)
+
+		if self[Layer.PAWN   << 1 | index] & bit: return PAWN_ATTACKS[index][square]
+		if self[Layer.KNIGHT << 1 | index] & bit: return KNIGHT_ATTACKS     [square]
+		if self[Layer.KING   << 1 | index] & bit: return KING_ATTACKS       [square]
+		if self[Layer.BISHOP << 1 | index] & bit: return sweep(square, BISHOP_RAYS, occupied)
+		if self[Layer.ROOK   << 1 | index] & bit: return sweep(square, ROOK_RAYS  , occupied)
+
+		return sweep(square, QUEEN_RAYS, occupied)
+
+	def layer(self, square: int) -> Layer | None:
+		bit = 1 << square
+
+		for layer in Layer:
+			if (self[layer << 1] | self[layer << 1 | 1]) & bit:
+				return layer
+
+		return None
+
+	def attackers(self, square: src.algebra.Square, color: src.algebra.Color,
+		occupied: int | None = None,
+	) -> int:
+		if occupied is None:
+			occupied = self.occupied
+
+		index = bool(color)
+
+		queens = self[Layer.QUEEN << 1 | index]
+
+		return PAWN_ATTACKS[not index][square]         & self[Layer.PAWN   << 1 | index]            \
+			|  KNIGHT_ATTACKS        [square]         & self[Layer.KNIGHT << 1 | index]            \
+			|  KING_ATTACKS          [square]         & self[Layer.KING   << 1 | index]            \
+			|  sweep(square, BISHOP_RAYS, occupied) & (self[Layer.BISHOP << 1 | index] | queens) \
+			|  sweep(square, ROOK_RAYS  , occupied) & (self[Layer.ROOK   << 1 | index] | queens)
+
+	def attacked(self, square: src.algebra.Square, color: src.algebra.Color,
+		occupied: int | None = None,
+	) -> bool:
+		if occupied is None:
+			return bool(self.threats(color) >> square & 1)
+
+		return bool(self.attackers(square, color, occupied))
+
+	def threats(self, color: src.algebra.Color) -> int:
+		index = bool(color)
+
+		if (threats := self.maps[index]) is None:
+			threats = 0
+
+			for square in squares(self.sides[index]):
+				threats |= self.reach[square]
+
+			self.maps[index] = threats
+
+		return threats
+
+	def constraints(self, color: src.algebra.Color) -> tuple[int, dict[int, int]]:
+		index = bool(color)
+
+		if (constraints := self.guards[index]) is None:
+			other = src.algebra.Color(-color)
+			occupied = self.occupied
+
+			king = self[Layer.KING << 1 | index].bit_length() - 1
+			checkers = self.attackers(king, other, occupied)
+
+			match checkers.bit_count():
+				case 0: evasions = FULL
+				case 1: evasions = checkers | BETWEEN[king][checkers.bit_length() - 1]
+				case _: evasions = 0
+
+			queens = self[Layer.QUEEN << 1 | (not index)]
+			snipers = sweep(king, BISHOP_RAYS, 0) & (self[Layer.BISHOP << 1 | (not index)] | queens) \
+				|     sweep(king, ROOK_RAYS  , 0) & (self[Layer.ROOK   << 1 | (not index)] | queens)
+
+			pins = {}
+
+			for sniper in squares(snipers):
+				blockers = BETWEEN[king][sniper] & occupied
+
+				if blockers.bit_count() == 1 and blockers & self.sides[index]:
+					pins[blockers.bit_length() - 1] = BETWEEN[king][sniper] | 1 << sniper
+
+			constraints = self.guards[index] = evasions, pins
+
+		return constraints
+
+	def legal(self, square: src.algebra.Square, color: src.algebra.Color) -> int:
+		index = bool(color)
+
+		if not (kings := self[Layer.KING << 1 | index]):
+			return FULL
+
+		other = src.algebra.Color(-color)
+		occupied = self.occupied
+
+		bit = 1 << square
+		king = kings.bit_length() - 1
+
+		if square == king:
+			escapes = 0
+
+			for target in squares(KING_ATTACKS[king] & ~self.sides[index]):
+				if not self.attackers(target, other, occupied ^ bit):
+					escapes |= 1 << target
+
+			return escapes
+
+		evasions, pins = self.constraints(color)
+		legal = evasions & pins.get(square, FULL)
+
+		if self[Layer.PAWN << 1 | index] & bit and (ghosts := self[Layer.GHOST << 1 | (not index)] & PAWN_ATTACKS[index][square]):
+			target = ghosts.bit_length() - 1
+			middle = target - 8 if index else target + 8
+
+			occupied ^= bit | 1 << middle | ghosts
+
+			if self.attackers(king, other, occupied) & occupied: legal &= ~ghosts
+			else                                              : legal |=  ghosts
+
+		return legal
+
+	def exchange(self, source: int, target: int, values: tuple[int, ...]) -> int:
+		occupied = self.occupied
+
+		queens   = self[Layer.QUEEN  << 1] | self[Layer.QUEEN  << 1 | 1]
+		diagonal = self[Layer.BISHOP << 1] | self[Layer.BISHOP << 1 | 1] | queens
+		straight = self[Layer.ROOK   << 1] | self[Layer.ROOK   << 1 | 1] | queens
+
+		attackers = self.attackers(target, src.algebra.Color.WHITE, occupied) \
+			|       self.attackers(target, src.algebra.Color.BLACK, occupied)
+
+		victim = self.layer(target) if occupied >> target & 1 else None
+		attacker = self.layer(source)
+		assert attacker is not None
+
+		index = bool(self.sides[1] >> source & 1)
+		bit = 1 << source
+
+		gains = [values[victim] if victim is not None else 0]
+
+		while True:
+			gains.append(values[attacker] - gains[-1])
+
+			if max(-gains[-2], gains[-1]) < 0:
+				break
+
+			attackers &= ~bit
+			occupied  &= ~bit
+
+			attackers |= (sweep(target, BISHOP_RAYS, occupied) & diagonal | sweep(target, ROOK_RAYS, occupied) & straight) & occupied
+
+			index = not index
+
+			for layer in Layer:
+				if candidates := attackers & self[layer << 1 | index]:
+					bit = candidates & -candidates
+					attacker = layer
+
+					break
+
+			else:
+				break
+
+		gains.pop()  # the last capture is speculative: nobody is left to take back
+
+		while len(gains) > 1:
+			gain = gains.pop()
+			gains[-1] = -max(-gains[-1], gain)
+
+		return gains[0]
+
+	def generate(self, color: src.algebra.Color,
+		arook: int | None = None,
+		hrook: int | None = None,
+	) -> array[int]:
+		moves = array("H")
+		index = bool(color)
+
+		own = self.sides[index]
+		enemies = self.sides[not index]
+		empty = ~(own | enemies) & FULL
+
+		pushes  = PAWN_PUSHES [index]
+		attacks = PAWN_ATTACKS[index]
+		ghosts = self[Layer.GHOST << 1 | (not index)]
+
+		final = 0xFF << 56 if index else 0xFF
+		start = 0xFF << 48 >> 40 * index  # second rank of the side
+
+		pawns = self[Layer.PAWN << 1 | index]
+
+		while pawns:
+			low = pawns & -pawns
+			pawns ^= low
+
+			source = low.bit_length() - 1
+			legal = self.legal(source, color)
+
+			targets = pushes[source] & empty
+
+			if targets and low & start:
+				targets |= pushes[targets.bit_length() - 1] & empty
+
+			for flags, targets in (
+				(QUIET     , targets                   & legal),
+				(CAPTURE   , attacks[source] & enemies & legal),
+				(EN_PASSANT, attacks[source] & ghosts  & legal),
+			):
+				while targets:
+					bit = targets & -targets
+					targets ^= bit
+
+					target = bit.bit_length() - 1
+
+					if bit & final:
+						for officer in range(4):
+							moves.append(source | target << 6 | (PROMOTION | flags | officer) << 12)
+
+					elif flags == QUIET and abs(target - source) == 16:
+						moves.append(source | target << 6 | RUSH << 12)
+
+					else:
+						moves.append(source | target << 6 | flags << 12)
+
+		pieces = own & ~self[Layer.PAWN << 1 | index]
+
+		while pieces:
+			low = pieces & -pieces
+			pieces ^= low
+
+			source = low.bit_length() - 1
+			targets = self.reach[source] & ~own & self.legal(source, color)
+
+			while targets:
+				bit = targets & -targets
+				targets ^= bit
+
+				moves.append(source | (bit.bit_length() - 1) << 6 | (CAPTURE if bit & enemies else QUIET) << 12)
+
+		king = self[Layer.KING << 1 | index].bit_length() - 1
+
+		if self.castles(color, hrook, +1): moves.append(king | king + 2 << 6 | HROOK << 12)
+		if self.castles(color, arook, -1): moves.append(king | king - 2 << 6 | AROOK << 12)
+
+		return moves
+
+	def castles(self, color: src.algebra.Color, rook: int | None, step: int) -> bool:
+		if rook is None:
+			return False
+
+		king = self[Layer.KING << 1 | bool(color)].bit_length() - 1
+		other = src.algebra.Color(-color)
+
+		if king != (4 if color else 60) or BETWEEN[king][rook] & self.occupied:
+			return False
+
+		return not any(self.attacked(king + step * distance, other) for distance in range(3))
+
+	def valid(self, move: int, color: src.algebra.Color,
+		arook: int | None = None,
+		hrook: int | None = None,
+	) -> bool:  # whether generate would list the move, without generating
+		index = bool(color)
+
+		source = move & 0o77
+		target = move >> 6 & 0o77
+		flags = move >> 12
+
+		bit = 1 << source
+		goal = 1 << target
+
+		own = self.sides[index]
+		enemies = self.sides[not index]
+
+		if not own & bit or own & goal:
+			return False
+
+		if self[Layer.PAWN << 1 | index] & bit:
+			final = 0xFF << 56 if index else 0xFF
+
+			if bool(goal & final) != bool(flags & PROMOTION) or not goal & self.legal(source, color):
+				return False
+
+			empty = ~(own | enemies) & FULL
+			pushes = PAWN_PUSHES[index][source] & empty
+
+			kind = flags & CAPTURE if flags & PROMOTION else flags
+
+			if kind == QUIET     : return bool(pushes & goal)
+			if kind == RUSH      : return bool(pushes and bit & 0xFF << 48 >> 40 * index and PAWN_PUSHES[index][pushes.bit_length() - 1] & empty & goal)
+			if kind == CAPTURE   : return bool(PAWN_ATTACKS[index][source] & enemies & goal)
+			if kind == EN_PASSANT: return bool(PAWN_ATTACKS[index][source] & self[Layer.GHOST << 1 | (not index)] & goal)
+
+			return False
+
+		if flags == HROOK: return bool(self[Layer.KING << 1 | index] & bit) and target == source + 2 and self.castles(color, hrook, +1)
+		if flags == AROOK: return bool(self[Layer.KING << 1 | index] & bit) and target == source - 2 and self.castles(color, arook, -1)
+
+		if flags != QUIET and flags != CAPTURE:
+			return False
+
+		return bool(self.reach[source] & goal & self.legal(source, color)) and bool(goal & enemies) == (flags == CAPTURE)
@@ -1,23 +1,21 @@
 from __future__ import annotations
 
 
+from array import array
 from collections import defaultdict
-from contextlib import contextmanager
-from datetime import datetime
 from typing import Generator, SupportsIndex, Self
 
-import pygame
-
 import src.rules
-import src.theme
 import src.algebra
+import src.bitboard
 import src.material
 
 
 Piece = src.material.Piece | None
+Rule  = src.rules.Move | int | None  # rich, packed or null move
 
 
-class Board(list[Piece], src.theme.Drawable):
+class Board(list[Piece]):
 
 	default = "♜♞♝♛♚♝♞♜/♟♟♟♟♟♟♟♟/8/8/8/8/♙♙♙♙♙♙♙♙/♖♘♗♕♔♗♘♖"
 
@@ -75,12 +73,15 @@ class Board(list[Piece], src.theme.Drawable):
 	@property
 	def forsyth_edwards(self) -> str:
 		notation = ""
+		empty = 0
 
 		for index, piece in enumerate(self):
-			empty = 0
-			square = src.algebra.Square(index)
+			if index and index % 8 == 0:
+				notation += str(empty) if empty else ""
+				notation += "/"
+				empty = 0
 
-			if piece is None:
+			if piece is None or isinstance(piece, src.material.Ghost):
 				empty += 1
 				continue
 
@@ -88,21 +89,9 @@ class Board(list[Piece], src.theme.Drawable):
 				notation += str(empty)
 				empty = 0
 
-			if square % 8 == 0:
-				notation += "/"
-
 			notation += repr(piece)
 
-		return notation
-
-	@property
-	def rect(self) -> pygame.Rect:
-		return self.surf.get_rect(
-		#	center = pygame.Vector2(
-		#		src.theme.RESOLUTION // 2,
-		#		src.theme.RESOLUTION // 2,
-		#	)
-		)
+		return notation + str(empty) if empty else notation
 
 
 	def update(self, square: src.algebra.Square,
@@ -163,13 +152,11 @@ class Side(
 	def from_forsyth_edwards(cls, game: Game, color: src.algebra.Color, castling: str) -> Self:
 		side = cls(game, color)
 
-		if color:
-			if "k" in castling: side.arook = game[src.algebra.Square.H8]  # type: ignore
-			if "q" in castling: side.hrook = game[src.algebra.Square.A8]  # type: ignore
+		for piece in game:
+			side.add(piece)
 
-		else:
-			if "K" in castling: side.arook = game[src.algebra.Square.H1]  # type: ignore
-			if "Q" in castling: side.hrook = game[src.algebra.Square.A1]  # type: ignore
+		if ("k" if color else "K") in castling: side.hrook = side.rook(src.algebra.Square.H8 * color)
+		if ("q" if color else "Q") in castling: side.arook = side.rook(src.algebra.Square.A8 * color)
 
 		return side
 
@@ -182,6 +169,27 @@ class Side(
 	def targets(self) -> src.algebra.Squares:
 		return src.algebra.Squares.union(*(piece.targets for piece in self))
 
+	@property
+	def rules(self) -> list[src.rules.Move]:
+		rules = []
+
+		for piece in list(self):
+			for rule in piece.squares:
+				if isinstance(rule, src.rules.Promotion):
+					rules.extend(rule.promotions())
+
+				else:
+					rules.append(rule)
+
+		return rules
+
+	@property
+	def moves(self) -> array[int]:
+		return self.game.bitboards.generate(self.color,
+			self.arook.square if self.arook is not None else None,
+			self.hrook.square if self.hrook is not None else None,
+		)
+
 	@property
 	def other(self) -> Side:
 		return self.game.white if self.color else self.game.black
@@ -195,23 +203,48 @@ class Side(
 		notation = ""
 
 		if self.king is not None and not self.king.moved:
-			if self.arook is not None and not self.arook.moved: notation += "k" if self.color else "K"
-			if self.hrook is not None and not self.hrook.moved: notation += "q" if self.color else "Q"
+			if self.hrook is not None and not self.hrook.moved: notation += "k" if self.color else "K"
+			if self.arook is not None and not self.arook.moved: notation += "q" if self.color else "Q"
 
 		return notation
 
 
+	@property
+	def castles(self) -> int:
+		castles = 0
+
+		if self.arook is not None: castles ^= src.bitboard.CASTLES[bool(self.color)][0]
+		if self.hrook is not None: castles ^= src.bitboard.CASTLES[bool(self.color)][1]
+
+		return castles
+
+
+	def valid(self, move: int) -> bool:
+		return self.game.bitboards.valid(move, self.color,
+			self.arook.square if self.arook is not None else None,
+			self.hrook.square if self.hrook is not None else None,
+		)
+
+	def rook(self, square: src.algebra.Square) -> src.material.Rook | None:
+		if isinstance(rook := self.game[square], src.material.Rook) and rook.color == self.color:
+			return rook
+
+		return None
+
 	def sync(self, piece: src.material.Piece):
 		match piece:
 			case src.material.King(): self.king = piece
-			case src.material.Rook():
-				match piece.square * self.color:
-					case src.algebra.Square.A8: self.arook = piece
-					case src.algebra.Square.H8: self.hrook = piece
-
 			case src.material.Ghost():
 				self.ghost = piece
 
+	def revoke(self, piece: Piece, other: Piece):
+		if piece is self.king:
+			self.arook = None
+			self.hrook = None
+
+		if self.arook is not None and self.arook in (piece, other): self.arook = None
+		if self.hrook is not None and self.hrook in (piece, other): self.hrook = None
+
 	def add(self, piece: src.material.Piece | None):
 		if piece is None or piece.color != self.color:
 			return
@@ -228,7 +261,7 @@ class Side(
 		self[piece.__class__].discard(piece)
 
 
-class History(list[src.rules.Move | None]):
+class History(list[int | None]):  # packed moves, None for null or unknown ones
 
 	@classmethod
 	def from_forsyth_edwards(cls, full_clock: str, turn: str) -> Self:
@@ -238,36 +271,41 @@ class History(list[src.rules.Move | None]):
 
 
 	@property
-	def last(self) -> src.rules.Move | None:
+	def last(self) -> int | None:
 		return self.get(-1)
 
-	@property
-	def half_clock(self) -> int:
-		for index, rule in enumerate(reversed(self)):
-			if rule is not None and (isinstance(rule, src.rules.Capt) or isinstance(rule.piece, src.material.Pawn)):
-				return index
-
-		return len(self)
-
 	@property
 	def full_clock(self) -> int:
 		return len(self) // 2 + 1
 
-	@property
-	def forsyth_edwards(self) -> str:
-		return f"{self.half_clock} {self.full_clock}"
-
-
 	def get(self, index: SupportsIndex,
-		default: src.rules.Move | None = None,
-	) -> src.rules.Move | None:
+		default: int | None = None,
+	) -> int | None:
 		try: return self[index]
 		except IndexError: return default
 
 
+class Record(list[tuple[src.algebra.Square, Piece]]):
+
+	def __init__(self, game: Game, rule: Rule):
+		super().__init__()
+
+		self.rule = rule
+		self.key = game.key
+		self.clock = game.clock
+		self.sides = [(side, side.king, side.arook, side.hrook, side.ghost) for side in (game.white, game.black)]
+
+
+	def restore(self):
+		for side, king, arook, hrook, ghost in self.sides:
+			side. king = king
+			side.arook = arook
+			side.hrook = hrook
+			side.ghost = ghost
+
+
 class Game(Board):
 
-	testing = bool()
 	default = f"{Board.default} w KQkq - 0 1"
 
 
@@ -277,6 +315,14 @@ class Game(Board):
 		self.black = Side(self, src.algebra.Color.BLACK)
 		self.white = Side(self, src.algebra.Color.WHITE)
 
+		self.bitboards = src.bitboard.Bitboards()
+
+		self.records: list[Record] = []
+		self.journal: Record | None = None
+
+		self.key = 0
+		self.clock = 0  # halfmoves since the last capture or pawn move
+
 		super().__init__(pieces)
 
 		self.history = History()
@@ -286,33 +332,31 @@ class Game(Board):
 		return self.current
 
 	def __hash__(self) -> int:
-		return hash(datetime.now().timestamp())
+		return self.zobrist
 
 	def __setitem__(self, key: src.algebra.Square, value: src.material.Piece | None):
-		super().__setitem__(key, value)
+		other = self[key]
 
-		if not self.testing:
-			self.black.add(value)
-			self.white.add(value)
+		if self.journal is not None:
+			self.journal.append((key, other))
 
-	def __delitem__(self, key: src.algebra.Square):
-		value = self[key]
+		self.bitboards.place(key, other, value)
 
-		if not self.testing:
-			self.black.discard(value)
-			self.white.discard(value)
+		super().__setitem__(key, value)
 
-		super().__delitem__(key)
+		if other is not value:
+			self.black.discard(other)
+			self.white.discard(other)
 
+		self.black.add(value)
+		self.white.add(value)
 
-	def __iadd__(self, rule: src.rules.Move) -> Self:
-		self.history.append(rule())
+	def __delitem__(self, key: src.algebra.Square):
+		self[key] = None
 
-		if (ghost := self.current.ghost) is not None:
-			if self[ghost.square] is ghost:
-				del self[ghost.square]
 
-		return self
+	def __iadd__(self, rule: src.rules.Move) -> Self:
+		return self.push(rule)
 
 
 	@classmethod
@@ -322,16 +366,10 @@ class Game(Board):
 		if notation is None:
 			notation = cls.default
 
-		board, turn, castling, enpassant, _, full = notation.split()
+		board, turn, castling, enpassant, half, full = notation.split()
 
 		game = cls()
 
-		game.white = Side.from_forsyth_edwards(game, src.algebra.Color.WHITE, castling)
-		game.black = Side.from_forsyth_edwards(game, src.algebra.Color.BLACK, castling)
-
-		if turn == "b":
-			game.history.append(None)
-
 		index = 0
 
 		for row in board.split("/"):
@@ -342,13 +380,18 @@ class Game(Board):
 
 				index += 1 if piece_found else int(char)
 
+		game.white = Side.from_forsyth_edwards(game, src.algebra.Color.WHITE, castling)
+		game.black = Side.from_forsyth_edwards(game, src.algebra.Color.BLACK, castling)
+
+		game.history = History.from_forsyth_edwards(full, turn)
+		game.clock = int(half)
+		game.key = game.white.castles ^ game.black.castles ^ (src.bitboard.TURN if turn == "b" else 0)
+
 		if enpassant != "-":
 			square = src.algebra.Square.fromnotation(enpassant)
 			color = game.current.other.color
 			game.current.other.ghost = game[square] = src.material.Ghost(game, color)
 
-		game.history = History.from_forsyth_edwards(full, turn)
-
 		return game
 
 
@@ -357,9 +400,13 @@ class Game(Board):
 		notation = super().forsyth_edwards
 
 		current = "b" if self.current.color else "w"
-		enpassant = repr(self.current.ghost.square) if self.current.ghost is not None else "-"
+		enpassant = repr(self.current.other.ghost.square) if self.current.other.ghost is not None else "-"
+
+		return " ".join([notation, current, self.castling, enpassant, str(self.clock), str(self.history.full_clock)])
 
-		return " ".join([notation, current, enpassant, self.castling, self.history.forsyth_edwards])
+	@property
+	def zobrist(self) -> int:
+		return self.bitboards.key ^ self.key
 
 	@property
 	def castling(self) -> str:
@@ -371,74 +418,108 @@ class Game(Board):
 	def current(self) -> Side:
 		return self.black if len(self.history) & 1 else self.white
 
-	@property
-	@contextmanager
-	def dry_run(self):
-		original, self.testing = self.testing, True; yield
-		self.testing = original
 
+	def push(self, rule: Rule) -> Self:
+		self.journal = Record(self, rule)
+		self.key ^= src.bitboard.TURN ^ self.white.castles ^ self.black.castles
 
-	def draw(self, screen: pygame.Surface):
-		for square in src.algebra.Square:
-			square.draw(screen)
+		if isinstance(rule, src.rules.Move):
+			self.clock = 0 if isinstance(rule, src.rules.Capt) or isinstance(rule.piece, src.material.Pawn) else self.clock + 1
+			packed = rule.packed
 
-		super().draw(screen,
-			special_flags = pygame.BLEND_RGBA_MULT,
-		)
+			rule()
 
-		if self.selected is not None:
-			for square in self.selected.squares:
-				square.highlight(screen)
+			self.white.revoke(rule.piece, rule.other)
+			self.black.revoke(rule.piece, rule.other)
 
-		for piece in self:
-			if piece is not None:
-				if piece is self.selected:
-					if self.promoted is not None and piece is self.promoted.piece:
-						screen.blit(self.promoted.officer.surf(self.promoted.piece.color), self.promoted.piece.rect)
+		elif rule is not None:
+			self.clock = 0 if rule >> 12 & src.bitboard.CAPTURE or isinstance(self[src.bitboard.SQUARES[rule & 0o77]], src.material.Pawn) else self.clock + 1
+			packed = rule
 
-					else:
-						piece.highlight(screen)
+			self.play(rule)
 
-				else:
-					piece.draw(screen)
+		else:
+			self.clock += 1
+			packed = None
 
-				piece.ghost = piece.__class__.ghost  # HACK
+		self.key ^= self.white.castles ^ self.black.castles
+		self.history.append(packed)
 
-	def clicked(self, event: pygame.event.Event) -> bool:
-		for square in src.algebra.Square:
-			if not square.clicked(event):
-				continue
+		if (ghost := self.current.ghost) is not None:
+			if self[ghost.square] is ghost:
+				del self[ghost.square]
 
-			if self.promoted is not None:
-				if square == self.promoted.source:
-					self.promoted.officer = next(self.promoted.officers)
+			self.current.ghost = None
 
-				else:
-					if square == self.promoted.target:
-						self += self.promoted
+		self.records.append(self.journal)
+		self.journal = None
 
-					self.selected = None
-					self.promoted = None
+		return self
+
+	def pop(self) -> Rule:
+		record = self.records.pop()
+
+		for key, value in reversed(record):
+			self[key] = value
+
+		record.restore()
+		self.key = record.key
+		self.clock = record.clock
+
+		self.history.pop()
 
-				return True
+		return record.rule
 
-			if self.selected:
-				if (rule := self.selected.squares.get(square)) is not None:
-					if isinstance(rule, src.rules.Promotion):
-						self.promoted = rule
+	def play(self, move: int):
+		source = move      & 0o77
+		target = move >> 6 & 0o77
+		flags = move >> 12
 
-					else:
-						self += rule
-						self.selected = None
+		piece = self[src.bitboard.SQUARES[source]]
+		other = self[src.bitboard.SQUARES[target]]
+		assert piece is not None
+
+		match flags:
+			case src.bitboard.RUSH      : piece.side.ghost = self[src.bitboard.SQUARES[source + target >> 1]] = src.material.Ghost(self, piece.color)
+			case src.bitboard.EN_PASSANT: del self[src.bitboard.SQUARES[source & ~7 | target & 7]]
+
+		piece(src.bitboard.SQUARES[target])
+
+		if flags & src.bitboard.PROMOTION:
+			assert isinstance(piece, src.material.Pawn); piece.promote(src.material.OFFICERS[flags & 3])
+
+		self.white.revoke(piece, other)
+		self.black.revoke(piece, other)
+
+	def click(self, square: src.algebra.Square) -> bool:
+		if self.promoted is not None:
+			if square == self.promoted.source:
+				self.promoted.officer = next(self.promoted.officers)
+
+			else:
+				if square == self.promoted.target:
+					self += self.promoted
+
+				self.selected = None
+				self.promoted = None
+
+			return True
+
+		if self.selected:
+			if (rule := self.selected.squares.get(square)) is not None:
+				if isinstance(rule, src.rules.Promotion):
+					self.promoted = rule
 
 				else:
+					self += rule
 					self.selected = None
 
-				return True
-
-			if (piece := self[square]) is not None and piece.side:
-				self.selected = piece
+			else:
+				self.selected = None
 
 			return True
 
-		return False
+		if (piece := self[square]) is not None and piece.side:
+			self.selected = piece
+
+		return True
@@ -1,30 +1,88 @@
 from __future__ import annotations
 
 
-import pygame  #; pygame.init()
+from argparse import ArgumentParser
 
 import src.theme
+import src.algebra
 import src.engine
+import src.opponent
 
 
-running = True
+def main():
+	parser = ArgumentParser(prog = "python -m src.main",
+		description = "Play chess.",
+	)
+	parser.add_argument("-c", "--computer", choices = ["white", "black"], default = None,
+		help = "let the engine play this side",
+	)
+	parser.add_argument("-t", "--time", type = float, default = 1.0,
+		help = "engine thinking time per move in seconds",
+	)
+	parser.add_argument("-a", "--analyse", action = "store_true",
+		help = "keep searching while it is your turn and show the engine's line",
+	)
+	arguments = parser.parse_args()
 
-game = src.engine.Game.from_forsyth_edwards()
+	import pygame  # spawned engine workers re-import this module, only the window needs pygame
 
-while running:
-	for event in pygame.event.get():
-		if event.type == pygame.QUIT:
-			running = False
+	import src.view
 
-		game.clicked(event)
+	running = True
+	screen = src.view.window()
+	canvas = src.view.Canvas(screen)
 
-	src.theme.screen.fill(src.theme.EMPTY)
-	src.theme.screen.fill(src.theme.DARK,
-		special_flags = pygame.BLEND_RGBA_MULT,
-	)
+	game = src.engine.Game.from_forsyth_edwards()
+	opponent = src.opponent.Opponent(src.algebra.Color[arguments.computer.upper()] if arguments.computer is not None else None,
+		time = arguments.time,
+		ponder = arguments.analyse,
+	) if arguments.computer is not None or arguments.analyse else None
+
+	clock = pygame.time.Clock()
+
+	pygame.event.set_blocked(None)
+	pygame.event.set_allowed([  # mouse motion and the like never wake the loop
+		pygame.QUIT,
+		pygame.KEYDOWN,
+		pygame.MOUSEBUTTONDOWN,
+		pygame.WINDOWEXPOSED,
+	])
+
+	while running:
+		if opponent is not None:
+			opponent.update(game)
+
+		pygame.display.update(canvas(game, src.view.caption(opponent) if opponent is not None and opponent.ponder else ""))
+
+		if opponent is None or opponent.settled(game):
+			events = [pygame.event.wait(), *pygame.event.get()]  # nothing changes until the user acts
+
+		else:
+			clock.tick(src.theme.FPS)  # poll the engine at frame rate while it thinks
+			events = pygame.event.get()
+
+		for event in events:
+			match event.type:
+				case pygame.QUIT:
+					running = False
+
+				case pygame.WINDOWEXPOSED:  # the window system lost what was on screen
+					canvas.reset()
+
+				case pygame.KEYDOWN if event.key == pygame.K_n:  # new game
+					if opponent is not None:
+						opponent.cancel()
+
+					game = src.engine.Game.from_forsyth_edwards()
+
+				case pygame.MOUSEBUTTONDOWN if opponent is None or not opponent.turn(game):
+					src.view.clicked(event, game)
+
+	if opponent is not None:
+		opponent.close()
 
-	game.draw(src.theme.screen)
+	pygame.quit()
 
-	pygame.display.flip()
 
-pygame.quit()
+if __name__ == "__main__":
+	main()
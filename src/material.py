@@ -1,23 +1,21 @@
 from __future__ import annotations
 
 
-from copy import copy
 from enum import Enum
 from typing import TYPE_CHECKING, Self
 
-import pygame
-
-import src.theme
 import src.algebra
+import src.bitboard
 import src.rules
 
 if TYPE_CHECKING:
 	import src.engine
 
 
-class Piece(src.theme.Highlightable):
+class Piece:
 
 	square: src.algebra.Square
+	layer: src.bitboard.Layer
 
 	value: int = 0
 	width: int = 0
@@ -44,14 +42,12 @@ class Piece(src.theme.Highlightable):
 	def __repr__(self) -> str:
 		return self.forsyth_edwards
 
-	def __call__(self, target: src.algebra.Square,
-		kept: Piece | None = None,
-	) -> Self:
+	def __call__(self, target: src.algebra.Square) -> Self:
 		assert (source := self.square) is not None
 
 		del self.game[target]
+		del self.game[source]
 
-		self.game[source] = kept
 		self.game[target] = self
 
 		return self
@@ -66,18 +62,18 @@ class Piece(src.theme.Highlightable):
 	@classmethod
 	def from_forsyth_edwards(cls, game: src.engine.Game, symbol: str) -> Piece | None:
 		match symbol:
-			case "♟": return Pawn  (game, src.algebra.Color.BLACK)
-			case "♙": return Pawn  (game, src.algebra.Color.WHITE)
-			case "♜": return Rook  (game, src.algebra.Color.BLACK)
-			case "♖": return Rook  (game, src.algebra.Color.WHITE)
-			case "♞": return Knight(game, src.algebra.Color.BLACK)
-			case "♘": return Knight(game, src.algebra.Color.WHITE)
-			case "♝": return Bishop(game, src.algebra.Color.BLACK)
-			case "♗": return Bishop(game, src.algebra.Color.WHITE)
-			case "♛": return Queen (game, src.algebra.Color.BLACK)
-			case "♕": return Queen (game, src.algebra.Color.WHITE)
-			case "♚": return King  (game, src.algebra.Color.BLACK)
-			case "♔": return King  (game, src.algebra.Color.WHITE)
+			case "♟" | "p": return Pawn  (game, src.algebra.Color.BLACK)
+			case "♙" | "P": return Pawn  (game, src.algebra.Color.WHITE)
+			case "♜" | "r": return Rook  (game, src.algebra.Color.BLACK)
+			case "♖" | "R": return Rook  (game, src.algebra.Color.WHITE)
+			case "♞" | "n": return Knight(game, src.algebra.Color.BLACK)
+			case "♘" | "N": return Knight(game, src.algebra.Color.WHITE)
+			case "♝" | "b": return Bishop(game, src.algebra.Color.BLACK)
+			case "♗" | "B": return Bishop(game, src.algebra.Color.WHITE)
+			case "♛" | "q": return Queen (game, src.algebra.Color.BLACK)
+			case "♕" | "Q": return Queen (game, src.algebra.Color.WHITE)
+			case "♚" | "k": return King  (game, src.algebra.Color.BLACK)
+			case "♔" | "K": return King  (game, src.algebra.Color.WHITE)
 
 	@classmethod
 	def from_side(cls, side: src.engine.Side) -> Self:
@@ -92,98 +88,53 @@ class Piece(src.theme.Highlightable):
 	def moved(self) -> bool:
 		return self._moved or self.square not in self.stock * self.color
 
-	@property
-	def decal(self) -> str:
-		color = "b" if self.color else "w"
-
-		return color + super().decal
-
-	@property
-	def rect(self) -> pygame.Rect:
-		return self.surf.get_rect(
-			center = self.square.rect.center + src.theme.PIECE_OFFSET,
-		)
-
 	@property
 	def side(self) -> src.engine.Side:
 		return self.game.black if self.color else self.game.white
 
 	@property
-	def targets(self) -> src.algebra.Squares:
-		return src.algebra.Squares()
+	def attacks(self) -> int:
+		return 0
 
 	@property
-	def squares(self) -> src.algebra.Squares:
-		squares = self.targets.copy()
-
-		for step in self.targets:
-			with step.preview:
-				if self.side.king is not None and not self.side.king.safe:
-					squares.discard(step)
-
-		return squares
-
+	def targets(self) -> src.algebra.Squares:
+		targets = src.algebra.Squares()
+		bitboards = self.game.bitboards
 
-	def clicked(self, event: pygame.event.Event) -> bool:
-		if clicked := self.square.clicked(event):
-			self.game.selected = self
+		enemies = bitboards.side(self.side.other.color)
+		attacks = self.attacks & ~bitboards.side(self.color)
 
-		return clicked
+		for target in src.bitboard.squares(attacks & ~enemies): targets.add(src.rules.Move(target, self))
+		for target in src.bitboard.squares(attacks &  enemies): targets.add(src.rules.Capt(target, self))
 
-	def draw(self, screen: pygame.Surface):
-		if self.ghost:
-			surf = copy(self.surf)
-			surf.fill((*src.theme.HIGH, 85 * (3 - self.ghost)),
-				special_flags = pygame.BLEND_RGBA_MULT,
-			)
+		return targets
 
-		else:
-			surf = self.surf
+	@property
+	def squares(self) -> src.algebra.Squares:
+		squares = self.targets
+		squares.mask &= self.game.bitboards.legal(self.square, self.color)
 
-		screen.blit(surf, self.rect)
+		return squares
 
 
 class Melee(Piece):
 
 	@property
-	def targets(self) -> src.algebra.Squares:
-		targets = super().targets
-
-		for move in self.moves:
-			try:
-				if step := src.rules.Move(self.square + move, self): targets.add(step)
-				if step := src.rules.Capt(self.square + move, self): targets.add(step)
-
-			except ValueError:
-				continue
-
-		return targets
+	def attacks(self) -> int:
+		return src.bitboard.LEAPS[self.layer][self.square]
 
 
 class Ranged(Piece):
 
 	@property
-	def targets(self) -> src.algebra.Squares:
-		targets = super().targets
-
-		for move in self.moves:
-			target = self.square
-
-			try:
-				while step := src.rules.Move(target := target + move, self):
-					targets.add(step)
-
-			except ValueError:
-				continue
-
-			if step := src.rules.Capt(target, self):
-				targets.add(step)
-
-		return targets
+	def attacks(self) -> int:
+		return src.bitboard.sweep(self.square, src.bitboard.SLIDES[self.layer], self.game.bitboards.occupied)
 
 
 class Rook(Ranged):
 
+	layer = src.bitboard.Layer.ROOK
+
 	value: int = 5
 	width: int = 5
 
@@ -202,17 +153,15 @@ class Rook(Ranged):
 	)
 
 
-class Assymetric(Piece):
+class Assymetric(Piece):  # drawn mirrored for black
 
-	@property
-	def decal(self) -> str:
-		flipped = "r" if self.color else ""
-
-		return super().decal + flipped
+	...
 
 
 class Bishop(Ranged, Assymetric):
 
+	layer = src.bitboard.Layer.BISHOP
+
 	value: int = 3
 	width: int = 6
 
@@ -233,6 +182,8 @@ class Bishop(Ranged, Assymetric):
 
 class Knight(Melee, Assymetric):
 
+	layer = src.bitboard.Layer.KNIGHT
+
 	value: int = 3
 	width: int = 5
 
@@ -271,6 +222,8 @@ class Star(Piece):
 
 class Queen(Ranged, Star):
 
+	layer = src.bitboard.Layer.QUEEN
+
 	value: int = 9
 
 	black: str = "♛"
@@ -283,6 +236,8 @@ class Queen(Ranged, Star):
 
 class King(Melee, Star):
 
+	layer = src.bitboard.Layer.KING
+
 	black: str = "♚"
 	white: str = "♔"
 
@@ -295,18 +250,16 @@ class King(Melee, Star):
 	)
 
 
-	def __call__(self, target: src.algebra.Square,
-		kept: Piece | None = None,
-	) -> Self:
+	def __call__(self, target: src.algebra.Square) -> Self:
 		assert (source := self.square) is not None
 
 		if not self.moved:
-			if self.side.arook is not None and target == source + src.algebra.Vector.E2:
-				self.side.arook(target + src.algebra.Vector.W, kept)
-			if self.side.hrook is not None and target == source + src.algebra.Vector.W2:
-				self.side.hrook(target + src.algebra.Vector.E, kept)
+			if self.side.hrook is not None and target == source + src.algebra.Vector.E2:
+				self.side.hrook(target + src.algebra.Vector.W)
+			if self.side.arook is not None and target == source + src.algebra.Vector.W2:
+				self.side.arook(target + src.algebra.Vector.E)
 
-		return super().__call__(target, kept)
+		return super().__call__(target)
 
 
 	@property
@@ -321,7 +274,7 @@ class King(Melee, Star):
 
 	@property
 	def safe(self) -> bool:
-		return self.square not in self.side.other.targets.capts
+		return not self.game.bitboards.attacked(self.square, self.side.other.color)
 
 
 class Officer(Enum):
@@ -332,23 +285,14 @@ class Officer(Enum):
 	B = Bishop
 
 
-	def surf(self, color: src.algebra.Color) -> pygame.Surface:
-		mod = "B" if color else "W"
-
-		match self.name:
-			case "Q": surf = src.theme.Main[mod + "QUEEN" ].value.copy()
-			case "R": surf = src.theme.Main[mod + "ROOK"  ].value.copy()
-			case "B": surf = src.theme.Main[mod + "BISHOP"].value.copy()
-			case "N": surf = src.theme.Main[mod + "KNIGHT"].value.copy()
-			case  _ : surf = src.theme.Main[mod + "PAWN"  ].value.copy()
-
-		surf.fill((*src.theme.HIGH, 170), special_flags = pygame.BLEND_RGBA_MULT)
 
-		return surf
+OFFICERS = tuple(Officer)  # by packed promotion index
 
 
 class Pawn(Piece):
 
+	layer = src.bitboard.Layer.PAWN
+
 	value: int = 1
 	width: int = 2
 
@@ -374,48 +318,40 @@ class Pawn(Piece):
 	)
 
 
+	@property
+	def attacks(self) -> int:
+		return src.bitboard.PAWN_ATTACKS[bool(self.color)][self.square]
+
 	@property
 	def targets(self) -> src.algebra.Squares:
-		targets = super().targets
-
-		for move in self.moves * self.color:
-			try:
-				if step := src.rules.Move(target := self.square + move, self):
-					targets.add(
-						src.rules.specialize(step,
-							src.rules.Promotion,
-						)
-					)
-
-					if step := src.rules.Rush(target := target + move, self):
-						targets.add(step)
-
-			except ValueError:
-				continue
-
-		for capt in self.capts * self.color:
-			try:
-				if step := src.rules.Capt(self.square + capt, self):
-					targets.add(
-						src.rules.specialize(step,
-							src.rules.EnPassant,
-							src.rules.Promotion,
-						)
-					)
-
-			except ValueError:
-				continue
+		targets = src.algebra.Squares()
+		bitboards = self.game.bitboards
 
-		return targets
+		empty = ~bitboards.occupied
+		pushes = src.bitboard.PAWN_PUSHES[bool(self.color)]
 
-	@property
-	def rect(self) -> pygame.Rect:
-		return self.surf.get_rect(
-			center = self.square.rect.center + pygame.Vector2(
-				src.theme.PIECE_OFFSET.x * 49 // 25,
-				src.theme.PIECE_OFFSET.y * 25 // 24,
-			),
-		)
+		for target in src.bitboard.squares(pushes[self.square] & empty):
+			targets.add(
+				src.rules.specialize(src.rules.Move(target, self),
+					src.rules.Promotion,
+				)
+			)
+
+			for target in src.bitboard.squares(pushes[target] & empty):
+				if step := src.rules.Rush(target, self):
+					targets.add(step)
+
+		enemies = bitboards.side(self.side.other.color) | bitboards.pieces(src.bitboard.Layer.GHOST, self.side.other.color)
+
+		for target in src.bitboard.squares(self.attacks & enemies):
+			targets.add(
+				src.rules.specialize(src.rules.Capt(target, self),
+					src.rules.EnPassant,
+					src.rules.Promotion,
+				)
+			)
+
+		return targets
 
 
 	def promote(self, to: Officer):
@@ -423,15 +359,7 @@ class Pawn(Piece):
 
 class Ghost(Piece):
 
+	layer = src.bitboard.Layer.GHOST
+
 	width = 2
 	ghost = 3
-
-
-	@property
-	def rect(self) -> pygame.Rect:
-		return self.surf.get_rect(
-			center = self.square.rect.center + pygame.Vector2(
-				src.theme.PIECE_OFFSET.x * 49 // 25,
-				src.theme.PIECE_OFFSET.y * 25 // 24,
-			),
-		)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.queues import Queue
+from queue import Empty
+
+import src.rules
+import src.algebra
+import src.engine
+import src.search
+import src.bitboard
+import src.transposition
+
+
+stop : src.search.Stopper       | None = None  # set by Opponent.cancel
+queue: Queue                    | None = None  # iterations reported back to the window
+table: src.transposition.Table | None = None  # kept by the worker across moves
+
+
+def initialize(event: src.search.Stopper, reports: Queue):
+	global stop, queue, table
+
+	stop = event
+	queue = reports
+	table = src.transposition.Table()
+
+
+def think(notation: str, depth: int, time: float | None) -> tuple[int, int]:
+	game = src.engine.Game.from_forsyth_edwards(notation)
+	key = game.zobrist
+
+	def report(result: src.search.Result):
+		if queue is not None:
+			queue.put((key, result.depth, result.score, result.line))
+
+	result = src.search.Search(game, table,
+		depth  = depth ,
+		time   = time  ,
+		stop   = stop  ,
+		report = report,
+	)()
+
+	return result.move, result.depth
+
+
+class Opponent:
+
+	def __init__(self, color: src.algebra.Color | None,
+		depth: int          = src.search.MAX_PLY,
+		time : float | None = 1.0,
+		ponder: bool = False,
+	):
+		self.color = color
+		self.depth = depth
+		self.time = time
+		self.ponder = ponder
+
+		context = get_context("spawn")  # do not fork a process holding a window
+
+		self.event = context.Event()
+		self.queue = context.Queue()
+		self.pool = ProcessPoolExecutor(1,
+			mp_context = context,
+			initializer = initialize,
+			initargs = (self.event, self.queue),
+		)
+
+		self.future: Future[tuple[int, int]] | None = None
+		self.key = 0  # position the last search was asked about
+		self.ply = 0
+
+		self.reached = 0
+		self.score = 0
+		self.moves: list[int] = []  # best line of the last completed iteration
+
+		self.expected = depth  # depth a search on our turn reaches, nothing shallower is trusted before one ran
+
+	def __bool__(self) -> bool:
+		return self.future is not None
+
+
+	@property
+	def evaluation(self) -> str:
+		score = self.score if self.ply & 1 == 0 else -self.score  # from white's point of view
+
+		if src.search.mated(score):
+			return f"#{(src.search.MATE - abs(score) + 1) // 2 * (1 if score > 0 else -1)}"
+
+		return f"{score / src.search.PAWN:+.2f}"
+
+
+	def turn(self, game: src.engine.Game) -> bool:
+		return game.current.color == self.color
+
+	def settled(self, game: src.engine.Game) -> bool:  # no search running and none due until the board changes
+		return self.future is None and game.zobrist == self.key
+
+	def predicted(self, game: src.engine.Game) -> src.rules.Move | None:
+		if not self.turn(game) or len(self.moves) < 2 or len(game.history) != self.ply + 1:
+			return None
+
+		if game.history.last != self.moves[0]:
+			return None
+
+		if self.reached - 1 < self.expected:  # the reply was searched shallower than a search of its own would go
+			return None
+
+		return src.search.lookup(game, self.moves[1])
+
+	def listen(self):
+		while True:
+			try:
+				key, reached, score, moves = self.queue.get_nowait()
+
+			except Empty:
+				return
+
+			if key == self.key:
+				self.reached = reached
+				self.score = score
+				self.moves = moves
+
+	def update(self, game: src.engine.Game) -> bool:
+		self.listen()
+
+		if self.future is not None and self.future.done():
+			future = self.future
+			self.future = None
+
+			if self.event.is_set():
+				self.event.clear()
+
+			elif self.turn(game) and game.zobrist == self.key:
+				move, self.expected = future.result()
+
+				if (rule := src.search.lookup(game, move)) is not None:
+					game += rule
+
+					return True
+
+		if game.zobrist == self.key:
+			return False
+
+		rule = self.predicted(game)  # the reply was already searched while pondering
+		self.cancel()
+
+		if rule is not None:
+			game += rule
+
+			return True
+
+		if self.future is not None:  # wait for the stale search to unwind
+			return False
+
+		self.key = game.zobrist
+		self.ply = len(game.history)
+
+		if self.turn(game):
+			self.future = self.pool.submit(think, game.forsyth_edwards, self.depth, self.time)
+
+		elif self.ponder:
+			self.future = self.pool.submit(think, game.forsyth_edwards, src.search.MAX_PLY, None)
+
+		return False
+
+	def cancel(self):
+		if self.future is not None:
+			self.event.set()  # the search unwinds at its next poll, its move is then dropped
+
+		self.key = 0
+
+		self.reached = 0
+		self.score = 0
+		self.moves = []
+
+	def close(self):
+		self.cancel()
+		self.pool.shutdown(
+			wait = False,
+			cancel_futures = True,
+		)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+
+import os
+
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Event
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+
+import src.engine
+import src.search
+import src.bitboard
+import src.transposition
+
+
+stop: src.search.Stopper | None = None  # inherited by every worker of the pool
+
+
+def initialize(event: src.search.Stopper):
+	global stop
+
+	stop = event
+
+
+def work(name: str, notation: str, index: int,
+	depth: int          = src.search.MAX_PLY,
+	time : float | None = None,
+) -> tuple[list[int], int, int, int, dict[str, int]]:
+	memory = SharedMemory(name)
+	table = src.transposition.Table(buffer = memory.buf)
+
+	try:
+		game = src.engine.Game.from_forsyth_edwards(notation)
+		result = src.search.Search(game, table,
+			depth = depth,
+			time  = time ,
+			start = 1 + index % 2,  # helpers stagger their iterations
+			stop  = stop,
+		)()
+
+		return result.line, result.score, result.depth, result.nodes, result.stats
+
+	finally:
+		table.release()
+		memory.close()
+
+
+def search(game: src.engine.Game,
+	processes: int          = os.cpu_count() or 1,
+	megabytes: int          = 64,
+	depth    : int          = src.search.MAX_PLY,
+	time     : float | None = None,
+) -> src.search.Result:
+	notation = game.forsyth_edwards
+	memory = SharedMemory(create = True, size = megabytes << 20)
+	event = Event()
+
+	try:
+		with ProcessPoolExecutor(processes, initializer = initialize, initargs = (event,)) as pool:
+			futures = [pool.submit(work, memory.name, notation, index, depth, time) for index in range(processes)]
+
+			wait(futures, return_when = FIRST_COMPLETED)
+			event.set()  # the first finished iteration calls off the helpers
+
+			results = [future.result() for future in futures]
+
+	finally:
+		memory.close()
+		memory.unlink()
+
+	line, score, depth, _, _ = max(results, key = lambda result: result[2])  # deepest completed iteration
+	nodes = sum(result[3] for result in results)
+	stats = sum((Counter(result[4]) for result in results), Counter())
+
+	return src.search.Result(line[0] if line else 0, score, depth, line, nodes, dict(stats))
+
+
+def main():
+	parser = ArgumentParser(prog = "python -m src.parallel",
+		description = "Search a position with several processes sharing one transposition table.",
+	)
+	parser.add_argument("notation", metavar = "fen", nargs = "?", default = src.engine.Game.default,
+		help = "position in Forsyth-Edwards notation (default: initial position)",
+	)
+	parser.add_argument("-d", "--depth", type = int, default = src.search.MAX_PLY,
+		help = "maximum depth in plies",
+	)
+	parser.add_argument("-t", "--time", type = float, default = None,
+		help = "time limit in seconds",
+	)
+	parser.add_argument("-p", "--processes", type = int, default = os.cpu_count() or 1,
+		help = "number of searching processes",
+	)
+	parser.add_argument("-m", "--megabytes", type = int, default = 64,
+		help = "size of the shared transposition table",
+	)
+	arguments = parser.parse_args()
+
+	if arguments.depth == src.search.MAX_PLY and arguments.time is None:
+		parser.error("give a --depth or a --time limit")
+
+	game = src.engine.Game.from_forsyth_edwards(arguments.notation)
+
+	start = perf_counter()
+	result = search(game, arguments.processes, arguments.megabytes, arguments.depth, arguments.time)
+	elapsed = perf_counter() - start
+
+	print(f"move : {src.bitboard.notation(result.move) if result.move else '-'}")
+	print(f"score: {result.score}")
+	print(f"depth: {result.depth}")
+	print(f"line : {' '.join(map(src.bitboard.notation, result.line))}")
+	print()
+	print(f"nodes: {result.nodes}")
+	print(f"time : {elapsed:.3f} s")
+	print(f"nps  : {result.nodes / elapsed if elapsed else 0:.0f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import src.search
+import src.engine
+import src.bitboard
+
+
+SUITE = (  # standard positions with known node counts, the oracle for move generation
+	(src.engine.Game.default                                                 , 4, 197281),
+	("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"   , 3,  97862),
+	("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"                              , 4,  43238),
+	("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"       , 3,   9467),
+	("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8"              , 3,  62379),
+	("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P3/2NP1N2/PPP1QPPP/R4RK1 w - - 0 10", 3,  75352),
+)
+
+
+def perft(game: src.engine.Game, depth: int) -> int:
+	if depth == 0:
+		return 1
+
+	moves = game.current.moves
+
+	if depth == 1:
+		return len(moves)
+
+	nodes = 0
+
+	for move in moves:
+		game.push(move)
+		nodes += perft(game, depth - 1)
+		game.pop()
+
+	return nodes
+
+
+def branch(notation: str, root: str, depth: int) -> int:
+	game = src.engine.Game.from_forsyth_edwards(notation)
+
+	for move in game.current.moves:
+		if src.bitboard.notation(move) == root:
+			game.push(move)
+
+			return perft(game, depth - 1)
+
+	raise ValueError(f"{root} is not a legal move in {notation}")
+
+
+def divide(notation: str, depth: int,
+	processes: int = 1,
+) -> dict[str, int]:
+	game = src.engine.Game.from_forsyth_edwards(notation)
+	roots = [src.bitboard.notation(move) for move in game.current.moves]
+
+	if processes > 1:
+		with ProcessPoolExecutor(processes) as pool:
+			counts = pool.map(branch, [notation] * len(roots), roots, [depth] * len(roots))
+
+			return dict(zip(roots, counts))
+
+	divided = {}
+
+	for move in game.current.moves:
+		game.push(move)
+		divided[src.bitboard.notation(move)] = perft(game, depth - 1)
+		game.pop()
+
+	return divided
+
+
+def agrees(notation: str) -> bool:  # a packed move and its rule leave the same position behind
+	game = src.engine.Game.from_forsyth_edwards(notation)
+	start = game.forsyth_edwards
+
+	for move in game.current.moves:
+		packed = game.push(move).forsyth_edwards
+		game.pop()
+
+		if (rule := src.search.lookup(game, move)) is None:
+			return False
+
+		ruled = game.push(rule).forsyth_edwards
+		game.pop()
+
+		if packed != ruled or game.forsyth_edwards != start:
+			return False
+
+	return True
+
+
+def check(
+	processes: int = 1,
+) -> bool:
+	passed = True
+
+	for notation, depth, expected in SUITE:
+		nodes = sum(divide(notation, depth, processes).values())
+		ok = nodes == expected and agrees(notation)
+		passed &= ok
+
+		print(f"{'ok' if ok else 'FAIL':4} {nodes:>9} / {expected:<9} depth {depth}  {notation}")
+
+	return passed
+
+
+def main():
+	parser = ArgumentParser(prog = "python -m src.perft",
+		description = "Count leaf nodes of the legal move tree of a position.",
+	)
+	parser.add_argument("notation", metavar = "fen", nargs = "?", default = src.engine.Game.default,
+		help = "position in Forsyth-Edwards notation (default: initial position)",
+	)
+	parser.add_argument("depth", type = int, nargs = "?", default = None,
+		help = "depth in plies",
+	)
+	parser.add_argument("-p", "--processes", type = int, default = 1,
+		help = "split the root moves across this many processes",
+	)
+	parser.add_argument("-s", "--suite", action = "store_true",
+		help = "check the node counts of the standard positions instead",
+	)
+	arguments = parser.parse_args()
+
+	if arguments.suite:
+		raise SystemExit(0 if check(arguments.processes) else 1)
+
+	if arguments.depth is None and arguments.notation.lstrip("-").isdigit():  # a lone depth fills the first optional slot
+		arguments.depth = int(arguments.notation)
+		arguments.notation = src.engine.Game.default
+
+	if arguments.depth is None:
+		parser.error("give a depth or --suite")
+
+	if arguments.depth < 0:
+		parser.error("depth must not be negative")
+
+	start = perf_counter()
+
+	if arguments.depth:
+		divided = divide(arguments.notation, arguments.depth, arguments.processes)
+		nodes = sum(divided.values())
+
+	else:  # the position itself, there are no root moves to divide
+		divided = {}
+		nodes = perft(src.engine.Game.from_forsyth_edwards(arguments.notation), 0)
+
+	elapsed = perf_counter() - start
+
+	for root, count in sorted(divided.items()):
+		print(f"{root}: {count}")
+
+	print()
+	print(f"nodes: {nodes}")
+	print(f"time : {elapsed:.3f} s")
+	print(f"nps  : {nodes / elapsed if elapsed else 0:.0f}")
+
+
+if __name__ == "__main__":
+	main()
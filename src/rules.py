@@ -3,14 +3,14 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
+from copy import copy
 from itertools import cycle
-from functools import cached_property
+from functools import cache, cached_property
 from typing import TYPE_CHECKING, Generator, Self, cast
 
-import pygame
-
 import src.theme
 import src.algebra
+import src.bitboard
 
 if TYPE_CHECKING: import src.material
 if TYPE_CHECKING: import src.engine
@@ -47,6 +47,7 @@ class Move(Base, src.algebra.square):
 
 	highlight_color = src.theme.GREEN
 	symbol = "∘"
+	flags = src.bitboard.QUIET
 
 
 	def __init__(self, square: src.algebra.Square, piece: src.material.Piece):
@@ -61,6 +62,12 @@ class Move(Base, src.algebra.square):
 	def __repr__(self) -> str:
 		return repr(self.piece) + repr(self.source) + self.symbol + repr(self.target)
 
+	def __copy__(self) -> Self:
+		rule = int.__new__(self.__class__, self)
+		rule.__dict__.update(self.__dict__)
+
+		return rule
+
 	def __call__(self) -> Self:
 		self.piece(self.target)
 
@@ -74,32 +81,28 @@ class Move(Base, src.algebra.square):
 	def side(self) -> src.engine.Side:
 		return self.piece.side
 
+	@property
+	def packed(self) -> int:
+		assert self.source is not None; return src.bitboard.pack(self.source, self.target, self.flags)
+
 	@property
 	@contextmanager
 	def preview(self) -> Generator[Self]:
-		with self.game.dry_run:
-			self.piece(self.target                   ); yield self
-			self.piece(self.source, kept = self.other);       self.other = None
+		self.game.push(self); yield self
+		self.game.pop()
 
 
 class Capt(Move):
 
 	highlight_color = src.theme.RED
 	symbol = "×"
+	flags = src.bitboard.CAPTURE
 
 
 	def __bool__(self) -> bool:
 		return (other := self.game[self.target]) is not None and self.piece.color != other.color
 
 
-	def highlight(self, screen: pygame.Surface, **kwargs):
-		assert self.other is not None
-		return super().highlight(screen,
-			width = self.other.width,
-			thick = 8,
-		)
-
-
 class Spec(Move):
 
 	highlight_color = src.theme.BLUE
@@ -108,9 +111,7 @@ class Spec(Move):
 class Mod(Move):
 
     def __new__(cls, move: Move):
-        modded_cls = type(cls.__name__, (cls, move.__class__), {})
-
-        return super().__new__(cast(type[Self], modded_cls), move.target, move.piece)
+        return super().__new__(cast(type[Self], modded(cls, move.__class__)), move.target, move.piece)
 
     def __init__(self, move: Move):
         super().__init__(move.target, move.piece)
@@ -118,6 +119,9 @@ class Mod(Move):
 
 class Rush(Spec):
 
+	flags = src.bitboard.RUSH
+
+
 	def __init__(self, square: src.algebra.Square, piece: src.material.Piece):
 		super().__init__(square, piece)
 
@@ -134,6 +138,9 @@ class Rush(Spec):
 
 class EnPassant(Mod, Capt):
 
+	flags = src.bitboard.EN_PASSANT
+
+
 	def __init__(self, move: Move):
 		super().__init__(move)
 
@@ -148,16 +155,6 @@ class EnPassant(Mod, Capt):
 		return self.other is not None and isinstance(self.other, src.material.Ghost) and super().__bool__()
 
 
-	def highlight(self, screen: pygame.Surface, **kwargs):
-		super().highlight(screen, **kwargs)
-
-		if self.other is not None:
-			self.other.ghost = 1
-
-		#	if (piece := self.game[self.middle]) is not None:
-		#		piece.ghost = 2
-
-
 class Promotion(Mod):
 
 	def __init__(self, move: Move):
@@ -174,18 +171,31 @@ class Promotion(Mod):
 		return self
 
 	def __repr__(self) -> str:
-		return super().__repr__() + repr(self.officer.value.forsyth_edwards)
+		return super().__repr__() + (self.officer.value.black if self.piece.color else self.officer.value.white)
 
 	def __bool__(self) -> bool:
 		return self.target.rank.final(self.piece.color) and super().__bool__()
 
 
+	@property
+	def flags(self) -> int:  # type: ignore  # depends on the officer
+		return src.bitboard.PROMOTION | (src.bitboard.CAPTURE if isinstance(self, Capt) else 0) | src.material.OFFICERS.index(self.officer)
+
+
 	@cached_property
 	def officers(self) -> cycle[src.material.Officer]:
 		assert isinstance(self.piece, src.material.Pawn)
 		return cycle(src.material.Officer)
 
 
+	def promotions(self) -> Generator[Self]:
+		for officer in src.material.Officer:
+			promotion = copy(self)
+			promotion.officer = officer
+
+			yield promotion
+
+
 class Cast(Spec, ABC):
 
 	capts: src.algebra.Vectors
@@ -193,19 +203,21 @@ class Cast(Spec, ABC):
 
 
 	def __bool__(self) -> bool:
-		return self.king is not None and not self.king.moved and not self.rook.moved and self.king.safe \
-		and all(self.game[self.king.square + move]    is None                    for move in self.moves) \
-		and all(          self.king.square + capt not in self.side.other.targets for capt in self.capts)
+		return self.king is not None and not self.king.moved and self.rook is not None and not self.rook.moved and self.king.safe \
+		and all(    self.game[self.king.square + move] is None                                    for move in self.moves) \
+		and all(not self.game.bitboards.attacked(self.king.square + capt, self.side.other.color) for capt in self.capts)
 
 
 	@property
 	@abstractmethod
-	def rook(self) -> src.material.Rook:
+	def rook(self) -> src.material.Rook | None:
 		...
 
 
 class CastWest(Cast):
 
+	flags = src.bitboard.AROOK
+
 	capts = src.algebra.Vectors(
 		src.algebra.Vector.W ,
 		src.algebra.Vector.W2,
@@ -226,6 +238,8 @@ class CastWest(Cast):
 
 class CastEast(Cast):
 
+	flags = src.bitboard.HROOK
+
 	capts = src.algebra.Vectors(
 		src.algebra.Vector.E ,
 		src.algebra.Vector.E2,
@@ -242,6 +256,11 @@ class CastEast(Cast):
 		return self.side.hrook
 
 
+@cache
+def modded(mod: type[Mod], move: type[Move]) -> type[Mod]:
+	return type(mod.__name__, (mod, move), {})
+
+
 def specialize(move: Move, *mods: type[Mod]) -> Move:
 	for mod in mods:
 		if modded := mod(move):
@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+
+from functools import partial
+from time import perf_counter
+from typing import Callable, Generator, NamedTuple, Protocol
+
+import src.rules
+import src.engine
+import src.bitboard
+import src.material
+import src.transposition
+
+
+PAWN = 100  # centipawns per unit of Piece.value
+
+MAX_PLY  = 64
+MATE     = 30000
+INFINITY = 32000
+
+ASPIRATION = 50
+NODE_CHECK = 1023  # poll the clock every 1024 nodes
+
+FUTILITY = (0, 200, 500)  # margins by remaining depth
+
+VALUES = (  # exchange values by src.bitboard.Layer
+	src.material.Pawn  .value,
+	src.material.Knight.value,
+	src.material.Bishop.value,
+	src.material.Rook  .value,
+	src.material.Queen .value,
+	100,  # king
+	0,    # ghost
+)
+OFFICERS = tuple(officer.value.value for officer in src.material.OFFICERS)  # by packed promotion index
+
+
+class Timeout(Exception):
+
+	...
+
+
+class Stopper(Protocol):  # threading.Event, multiprocessing.Event
+
+	def is_set(self) -> bool: ...
+
+
+class Result(NamedTuple):
+
+	move : int  # packed, 0 when there is none
+	score: int
+	depth: int
+	line : list[int]
+	nodes: int
+	stats: dict[str, int]
+
+
+def mated(score: int) -> bool:
+	return abs(score) >= MATE - MAX_PLY
+
+def to_table(score: int, ply: int) -> int:
+	return score + ply if score >= MATE - MAX_PLY else score - ply if score <= MAX_PLY - MATE else score
+
+def from_table(score: int, ply: int) -> int:
+	return score - ply if score >= MATE - MAX_PLY else score + ply if score <= MAX_PLY - MATE else score
+
+
+def noisy(move: int) -> bool:
+	return bool(move >> 12 & (src.bitboard.CAPTURE | src.bitboard.PROMOTION))
+
+def mvv_lva(bitboards: src.bitboard.Bitboards, move: int) -> int:
+	flags = move >> 12
+	score = 0
+
+	if flags == src.bitboard.EN_PASSANT:
+		score += VALUES[src.bitboard.Layer.PAWN] << 4
+
+	elif flags & src.bitboard.CAPTURE:
+		score += VALUES[bitboards.layer(move >> 6 & 0o77) or 0] << 4
+
+	if flags & src.bitboard.PROMOTION:
+		score += OFFICERS[flags & 3] << 4
+
+	return score - VALUES[bitboards.layer(move & 0o77) or 0]
+
+
+class Picker:
+
+	def __init__(self, search: Search, move: int, ply: int):
+		self.search = search
+		self.move = move
+		self.ply = ply
+
+	def __iter__(self) -> Generator[int]:
+		search = self.search
+		game = search.game
+
+		if self.move and game.current.valid(self.move):  # a cutoff here spares the generation
+			yield self.move
+
+		moves = game.current.moves
+
+		loud = []
+		quiet = []
+
+		for move in moves:
+			if move != self.move:
+				(loud if noisy(move) else quiet).append(move)
+
+		loud.sort(key = partial(mvv_lva, game.bitboards), reverse = True)
+
+		yield from loud
+
+		for killer in search.killers[self.ply]:
+			if killer in quiet:
+				quiet.remove(killer)
+
+				yield killer
+
+		history = search.history
+		index = bool(game.current.color) << 12
+
+		quiet.sort(key = lambda move: history[index | move & 0xFFF], reverse = True)
+
+		yield from quiet
+
+
+def lookup(game: src.engine.Game, move: int) -> src.rules.Move | None:  # packed move to rule, for the board
+	if not move:
+		return None
+
+	piece = game[src.bitboard.SQUARES[move & 0o77]]
+
+	if piece is None or not piece.side:
+		return None
+
+	for rule in piece.squares:
+		for rule in rule.promotions() if isinstance(rule, src.rules.Promotion) else (rule,):
+			if rule.packed == move:
+				return rule
+
+	return None
+
+
+class Search:
+
+	def __init__(self, game: src.engine.Game,
+		table: src.transposition.Table | None = None, *,
+		depth: int = MAX_PLY,
+		time : float | None = None,
+		nodes: int   | None = None,
+		start: int = 1,
+		stop : Stopper | None = None,
+		report: Callable[[Result], None] | None = None,
+		window: int = ASPIRATION,
+		null      : bool = True,
+		reductions: bool = True,
+		futility  : bool = True,
+	):
+		self.game = game
+		self.table = table if table is not None else src.transposition.Table()
+
+		self.depth = min(depth, MAX_PLY)
+		self.time = time
+		self.limit = nodes
+		self.start = max(1, min(start, self.depth))
+		self.stop = stop
+		self.report = report
+		self.window = window
+
+		self.null = null
+		self.reductions = reductions
+		self.futility = futility
+
+		self.nodes = 0
+		self.deadline: float | None = None
+
+		self.stats: dict[str, int] = {}
+
+		self.path: list[int] = []
+		self.lines: list[list[int]] = [[] for _ in range(MAX_PLY + 1)]
+
+		self.killers: list[list[int]] = [[0, 0] for _ in range(MAX_PLY + 1)]
+		self.history: list[int] = [0 for _ in range(2 << 12)]  # [color][source][target]
+
+	def __call__(self) -> Result:
+		game = self.game
+		root = len(game.records)
+
+		self.nodes = 0
+		self.deadline = perf_counter() + self.time if self.time is not None else None
+		self.stats = dict.fromkeys(("null", "futile", "reduced", "researched"), 0)
+		self.table.age()
+
+		result = Result(0, 0, 0, [], 0, dict(self.stats))
+		score = 0
+
+		for depth in range(self.start, self.depth + 1):
+			try:
+				score = self.aspire(depth, score)
+
+			except Timeout:
+				while len(game.records) > root:
+					game.pop()
+
+				self.path.clear()
+
+				if not result.move:  # no iteration completed, keep the best root move found so far
+					line = list(self.lines[0]) or list(game.current.moves[:1])
+					result = Result(line[0] if line else 0, 0, 0, line, self.nodes, dict(self.stats))
+
+				break
+
+			line = list(self.lines[0])
+			result = Result(line[0] if line else 0, score, depth, line, self.nodes, dict(self.stats))
+
+			if self.report is not None:
+				self.report(result)
+
+			if mated(score):
+				break
+
+		return result._replace(nodes = self.nodes, stats = dict(self.stats))  # count the unfinished iteration too
+
+
+	@property
+	def checked(self) -> bool:
+		king = self.game.current.king
+
+		return king is not None and not king.safe
+
+	@property
+	def officers(self) -> bool:
+		bitboards = self.game.bitboards
+		color = self.game.current.color
+
+		return bool(
+			bitboards.pieces(src.bitboard.Layer.KNIGHT, color) |
+			bitboards.pieces(src.bitboard.Layer.BISHOP, color) |
+			bitboards.pieces(src.bitboard.Layer.ROOK  , color) |
+			bitboards.pieces(src.bitboard.Layer.QUEEN , color)
+		)
+
+
+	def poll(self):
+		if self.limit is not None and self.nodes >= self.limit:
+			raise Timeout
+
+		if self.deadline is not None and perf_counter() >= self.deadline:
+			raise Timeout
+
+		if self.stop is not None and self.stop.is_set():
+			raise Timeout
+
+	def evaluate(self) -> int:
+		current = self.game.current
+
+		return (current.material - current.other.material) * PAWN
+
+	def exchange(self, move: int) -> int:
+		if (flags := move >> 12) == src.bitboard.EN_PASSANT or flags & src.bitboard.PROMOTION:
+			return 0
+
+		return self.game.bitboards.exchange(move & 0o77, move >> 6 & 0o77, VALUES) * PAWN
+
+	def cutoff(self, move: int, depth: int, ply: int):
+		if noisy(move):
+			return
+
+		if (killers := self.killers[ply])[0] != move:
+			killers[1] = killers[0]
+			killers[0] = move
+
+		self.history[bool(self.game.current.color) << 12 | move & 0xFFF] += depth * depth
+
+	def aspire(self, depth: int, guess: int) -> int:
+		if depth < 3:
+			return self.negamax(depth, -INFINITY, INFINITY, 0)
+
+		delta = self.window
+		alpha = max(guess - delta, -INFINITY)
+		beta  = min(guess + delta, +INFINITY)
+
+		while True:
+			score = self.negamax(depth, alpha, beta, 0)
+
+			if   score <= alpha: alpha = max(score - delta, -INFINITY)
+			elif score >= beta : beta  = min(score + delta, +INFINITY)
+			else:
+				return score
+
+			delta <<= 1
+
+	def negamax(self, depth: int, alpha: int, beta: int, ply: int,
+		null: bool = True,
+	) -> int:
+		self.nodes += 1
+
+		if not self.nodes & NODE_CHECK:
+			self.poll()
+
+		game = self.game
+		key = game.zobrist
+
+		self.lines[ply] = []
+
+		if ply and key in self.path:
+			return 0
+
+		if depth <= 0 or ply >= MAX_PLY:
+			return self.quiesce(alpha, beta, ply)
+
+		hashed = 0
+
+		if (entry := self.table.probe(key)) is not None:
+			hashed = entry.move
+
+			if ply and entry.depth >= depth:
+				score = from_table(entry.score, ply)
+
+				match entry.bound:
+					case src.transposition.Bound.EXACT                  : return score
+					case src.transposition.Bound.LOWER if score >= beta : return score
+					case src.transposition.Bound.UPPER if score <= alpha: return score
+
+		check = self.checked
+		pv = beta - alpha > 1
+		static = self.evaluate() if not pv and not check else None
+
+		if self.null and null and ply and static is not None and depth >= 3 and static >= beta and self.officers:
+			reduction = 3 if depth > 6 else 2
+
+			game.push(None)
+			score = -self.negamax(depth - 1 - reduction, -beta, 1 - beta, ply + 1, False)
+			game.pop()
+
+			if score >= beta:
+				self.stats["null"] += 1
+
+				return beta if mated(score) else score
+
+		futile = self.futility and static is not None and depth < len(FUTILITY) and static + FUTILITY[depth] <= alpha
+
+		floor = alpha
+		best = -INFINITY
+		best_move = 0
+		moved = False
+
+		self.path.append(key)
+
+		for index, move in enumerate(Picker(self, hashed, ply)):
+			quiet = not noisy(move)
+			moved = True
+
+			game.push(move)
+			gives = self.checked
+
+			if futile and quiet and not gives and best_move:
+				game.pop()
+
+				best = max(best, static)  # type: ignore  # futile implies a static evaluation
+				self.stats["futile"] += 1
+
+				continue
+
+			if self.reductions and index >= 3 and depth >= 3 and quiet and not check and not gives:
+				reduction = 1 if index < 6 else 2
+
+				self.stats["reduced"] += 1
+				score = -self.negamax(depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
+
+				if score > alpha:
+					self.stats["researched"] += 1
+					score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+
+			else:
+				score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+
+			game.pop()
+
+			if score > best:
+				best = score
+				best_move = move
+
+				if score > alpha:
+					alpha = score
+					self.lines[ply] = [move] + self.lines[ply + 1]
+
+					if alpha >= beta:
+						self.cutoff(move, depth, ply)
+
+						break
+
+		self.path.pop()
+
+		if not moved:
+			return ply - MATE if check else 0
+
+		if   best >= beta : bound = src.transposition.Bound.LOWER
+		elif best >  floor: bound = src.transposition.Bound.EXACT
+		else              : bound = src.transposition.Bound.UPPER
+
+		self.table.store(key, depth, to_table(best, ply), bound, best_move)
+
+		return best
+
+	def quiesce(self, alpha: int, beta: int, ply: int) -> int:
+		self.nodes += 1
+
+		if not self.nodes & NODE_CHECK:
+			self.poll()
+
+		game = self.game
+
+		if ply >= MAX_PLY:
+			return self.evaluate()
+
+		if check := self.checked:
+			best = ply - MATE
+			moves = sorted(game.current.moves, key = partial(mvv_lva, game.bitboards), reverse = True)
+
+		else:
+			best = self.evaluate()
+
+			if best >= beta:
+				return best
+
+			alpha = max(alpha, best)
+			moves = sorted(filter(noisy, game.current.moves), key = partial(mvv_lva, game.bitboards), reverse = True)
+
+		for move in moves:
+			if not check and self.exchange(move) < 0:
+				continue
+
+			game.push(move)
+			score = -self.quiesce(-beta, -alpha, ply + 1)
+			game.pop()
+
+			if score > best:
+				best = score
+
+				if score > alpha:
+					alpha = score
+
+					if alpha >= beta:
+						break
+
+		return best
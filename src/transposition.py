@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+
+from enum import IntEnum
+from typing import NamedTuple
+
+
+class Bound(IntEnum):
+
+	NONE  = 0
+	LOWER = 1  # score >= beta (fail high)
+	UPPER = 2  # score <= alpha (fail low)
+	EXACT = 3
+
+
+class Entry(NamedTuple):
+
+	depth: int
+	score: int
+	bound: Bound
+	move : int
+
+
+#	data word layout (low to high bits):
+#	move 16 | score 16 (biased) | depth 8 | bound 2 | generation 8
+MOVE  =  0
+SCORE = 16
+DEPTH = 32
+BOUND = 40
+AGE   = 42
+
+BIAS = 1 << 15
+
+ENTRY  = 16  # bytes: key word (xor data word) + data word
+BUCKET = 2   # entries: depth-preferred + always-replace
+
+
+class Table:
+
+	def __init__(self,
+		megabytes: int = 16,
+		buffer: memoryview | bytearray | None = None,
+	):
+		if buffer is None:
+			buffer = bytearray(megabytes << 20)
+
+		self.buffer = buffer
+		self.words = memoryview(buffer).cast("Q")
+		self.buckets = len(self.words) // (BUCKET << 1)
+
+		self.generation = 0
+
+		self.hits = 0
+		self.misses = 0
+		self.writes = 0
+		self.overwrites = 0
+
+	def __len__(self) -> int:
+		return self.buckets * BUCKET
+
+
+	@property
+	def stats(self) -> dict[str, int]:
+		return {
+			"hits"      : self.hits      ,
+			"misses"    : self.misses    ,
+			"writes"    : self.writes    ,
+			"overwrites": self.overwrites,
+		}
+
+	@property
+	def usage(self) -> float:
+		words = self.words
+		used = sum(1 for index in range(0, min(len(words), 2000), 2) if words[index])
+
+		return used / min(len(self), 1000)
+
+
+	def clear(self):
+		memoryview(self.buffer)[:] = bytes(len(self.buffer))
+
+		self.generation = 0
+
+		self.hits = 0
+		self.misses = 0
+		self.writes = 0
+		self.overwrites = 0
+
+	def release(self):
+		self.words.release()
+
+	def age(self):
+		self.generation = self.generation + 1 & 0xFF
+
+	def probe(self, key: int) -> Entry | None:
+		words = self.words
+		index = key % self.buckets * (BUCKET << 1)
+
+		for slot in range(index, index + (BUCKET << 1), 2):
+			data = words[slot + 1]
+
+			if words[slot] ^ data == key:  # a torn write from another process fails this check
+				self.hits += 1
+
+				return Entry(
+					depth = data >> DEPTH & 0xFF,
+					score = (data >> SCORE & 0xFFFF) - BIAS,
+					bound = Bound(data >> BOUND & 0x03),
+					move  = data >> MOVE & 0xFFFF,
+				)
+
+		self.misses += 1
+
+		return None
+
+	def store(self, key: int, depth: int, score: int, bound: Bound,
+		move: int = 0,
+	):
+		words = self.words
+		index = key % self.buckets * (BUCKET << 1)
+
+		depth = max(0, min(depth, 0xFF))
+		score = max(-BIAS, min(score, BIAS - 1))
+
+		data = words[index + 1]
+		stored = words[index] ^ data
+
+		if stored == key or depth >= (data >> DEPTH & 0xFF) or (data >> AGE & 0xFF) != self.generation:
+			slot = index  # depth-preferred
+
+		else:
+			slot = index + 2  # always-replace
+			stored = words[slot] ^ words[slot + 1]
+
+		if stored == key:
+			if not move:
+				move = words[slot + 1] >> MOVE & 0xFFFF
+
+		elif stored:
+			self.overwrites += 1
+
+		data = move << MOVE | score + BIAS << SCORE | depth << DEPTH | bound << BOUND | self.generation << AGE
+
+		words[slot] = key ^ data
+		words[slot + 1] = data
+
+		self.writes += 1
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+
+import os
+
+from enum import Enum
+from functools import cache, lru_cache
+from hashlib import sha1
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygame
+
+import src.rules
+import src.theme
+import src.algebra
+import src.engine
+import src.bitboard
+import src.material
+
+if TYPE_CHECKING:
+	import src.opponent
+
+
+ASSETS = Path("graphics")
+CACHE  = ASSETS / ".cache"  # scaled pixels by source digest and size, rebuilt whenever either changes
+
+PIECE_OFFSET = pygame.Vector2(src.theme.PIECE_OFFSET)
+PAWN_OFFSET = pygame.Vector2(
+	PIECE_OFFSET.x * 49 // 25,
+	PIECE_OFFSET.y * 25 // 24,
+)
+
+
+class Main(Enum):  # source image, size and transparency of every decal, loaded on first use
+
+	BOARD  = "board/oak-wood.jpg", src.theme.WINDOW, False
+	GAME   = "board/oak-wood.jpg", src.theme.WINDOW, False
+	SQUARE = "board/bevel.png"   , src.theme.SQUARE, False
+
+	BPIECE = None, src.theme.PIECE, True
+
+	BPAWN    = "piece/black/pawn.png"   , src.theme.PIECE, True
+	BGHOST   = "piece/black/pawn.png"   , src.theme.PIECE, True
+	BROOK    = "piece/black/rook.png"   , src.theme.PIECE, True
+	BKNIGHT  = "piece/black/knight.png" , src.theme.PIECE, True
+	BKNIGHTR = "piece/black/knightr.png", src.theme.PIECE, True
+	BBISHOP  = "piece/black/bishop.png" , src.theme.PIECE, True
+	BBISHOPR = "piece/black/bishopr.png", src.theme.PIECE, True
+	BQUEEN   = "piece/black/queen.png"  , src.theme.PIECE, True
+	BKING    = "piece/black/king.png"   , src.theme.PIECE, True
+
+	WPIECE = None, src.theme.PIECE, True
+
+	WPAWN    = "piece/white/pawn.png"   , src.theme.PIECE, True
+	WGHOST   = "piece/white/pawn.png"   , src.theme.PIECE, True
+	WROOK    = "piece/white/rook.png"   , src.theme.PIECE, True
+	WKNIGHT  = "piece/white/knight.png" , src.theme.PIECE, True
+	WKNIGHTR = "piece/white/knightr.png", src.theme.PIECE, True
+	WBISHOP  = "piece/white/bishop.png" , src.theme.PIECE, True
+	WBISHOPR = "piece/white/bishopr.png", src.theme.PIECE, True
+	WQUEEN   = "piece/white/queen.png"  , src.theme.PIECE, True
+	WKING    = "piece/white/king.png"   , src.theme.PIECE, True
+
+
+	@property
+	def surf(self) -> pygame.Surface:
+		return load(*self.value)
+
+
+@cache
+def load(path: str | None, size: tuple[int, int], alpha: bool) -> pygame.Surface:
+	if path is None:
+		return pygame.Surface(size,
+			flags = pygame.SRCALPHA,
+		)
+
+	source = (ASSETS / path).read_bytes()
+	form = "RGBA" if alpha else "RGB"
+	cached = CACHE / f"{sha1(source).hexdigest()}.{size[0]}x{size[1]}.{form.lower()}"
+
+	try:
+		with cached.open("rb") as file:
+			image = pygame.image.frombuffer(mmap(file.fileno(), 0, access = ACCESS_READ), size, form)
+
+	except (OSError, ValueError):  # missing, truncated or unreadable
+		image = pygame.image.load(BytesIO(source), path)
+		image = pygame.transform.smoothscale(image.convert_alpha() if alpha else image.convert(), size)
+
+		try:
+			CACHE.mkdir(parents = True, exist_ok = True)
+			partial = cached.with_suffix(f".{os.getpid()}")
+			partial.write_bytes(pygame.image.tobytes(image, form))
+			partial.replace(cached)  # atomic, a concurrent start never maps half a file
+
+		except OSError:  # read-only checkout, scale again next time
+			pass
+
+	return image.convert_alpha() if alpha else image.convert()
+
+
+@cache
+def font() -> pygame.font.Font:
+	pygame.font.init()
+
+	return pygame.font.Font(None, src.theme.BOARD_OFFSET * 5 // 12)
+
+
+def window() -> pygame.Surface:
+	return pygame.display.set_mode(src.theme.WINDOW)
+
+
+def decal(piece: src.material.Piece) -> Main:
+	color = "B" if piece.color else "W"
+	flipped = "R" if piece.color and isinstance(piece, src.material.Assymetric) else ""
+
+	return Main[color + piece.__class__.__name__.upper() + flipped]
+
+def surf(piece: src.material.Piece) -> pygame.Surface:
+	return decal(piece).surf
+
+def preview(officer: src.material.Officer, color: src.algebra.Color) -> pygame.Surface:
+	return tinted(Main[("B" if color else "W") + officer.value.__name__.upper()], (*src.theme.HIGH, 170), pygame.BLEND_RGBA_MULT)
+
+
+@lru_cache(maxsize = 128)  # derived surfaces are shared, blit them but never draw on them
+def tinted(decal: Main, tint: tuple[int, ...], flags: int) -> pygame.Surface:
+	surf = decal.surf.copy()
+	surf.fill(tint,
+		special_flags = flags,
+	)
+
+	return surf
+
+@lru_cache(maxsize = 128)
+def ellipse(size: tuple[int, int], color: src.theme.RGB, thick: int) -> pygame.Surface:
+	surf = pygame.Surface(size,
+		flags = pygame.SRCALPHA,
+	)
+	pygame.draw.ellipse(surf, color, surf.get_rect(), thick)
+
+	return surf
+
+
+def rect(square: src.algebra.square) -> pygame.Rect:
+	return pygame.Rect(
+		src.theme.SQUARE_W * (square.file),
+		src.theme.SQUARE_H * (square.rank >> 3) + src.theme.BOARD_OFFSET * 11 // 12,
+		src.theme.SQUARE_W,
+		src.theme.SQUARE_H,
+	)
+
+def place(piece: src.material.Piece) -> pygame.Rect:
+	offset = PAWN_OFFSET if isinstance(piece, src.material.Pawn | src.material.Ghost) else PIECE_OFFSET
+
+	return surf(piece).get_rect(
+		center = rect(piece.square).center + offset,
+	)
+
+def locate(position: tuple[int, int]) -> src.algebra.Square | None:
+	x, y = position
+
+	file = x // src.theme.SQUARE_W
+	rank = (y - src.theme.BOARD_OFFSET * 11 // 12) // src.theme.SQUARE_H
+
+	return src.algebra.Square(rank << 3 | file) if 0 <= file < 8 and 0 <= rank < 8 else None
+
+
+def tile(screen: pygame.Surface, square: src.algebra.Square):
+	screen.fill(src.theme.BLACK if square.color else src.theme.WHITE, rect(square))
+	screen.blit(Main.SQUARE.surf, rect(square),
+		special_flags = pygame.BLEND_RGBA_MULT,
+	)
+
+def ring(rule: src.rules.Move) -> tuple[int, int]:  # width and thickness of the highlight
+	return (rule.other.width, 8) if isinstance(rule, src.rules.Capt) and rule.other is not None else (1, 0)
+
+def highlight(screen: pygame.Surface, rule: src.rules.Move):
+	width, thick = ring(rule)
+
+	area = rect(rule)
+	area = area.inflate(
+		-area.width  // (width + 1) * 24 // 25,
+		-area.height // (width + 1) * 24 // 25,
+	).move(
+		+area.width  // 100,
+		-area.height // 100,
+	)
+	screen.blit(ellipse(area.size, rule.highlight_color, thick), area,
+		special_flags = pygame.BLEND_RGB_ADD,
+	)
+
+def sprite(screen: pygame.Surface, piece: src.material.Piece,
+	ghost: int = 0,
+):
+	image = tinted(decal(piece), (*src.theme.HIGH, 85 * (3 - ghost)), pygame.BLEND_RGBA_MULT) if ghost else surf(piece)
+
+	screen.blit(image, place(piece))
+
+def glow(screen: pygame.Surface, piece: src.material.Piece):
+	screen.blit(tinted(decal(piece), src.theme.BRIGHT, pygame.BLEND_RGB_ADD), place(piece))
+
+
+def selection(game: src.engine.Game) -> list[src.rules.Move]:
+	return list(game.selected.squares) if game.selected is not None else []
+
+def draw(screen: pygame.Surface, game: src.engine.Game, *areas: pygame.Rect,
+	text: str = "",
+	rules: list[src.rules.Move] | None = None,
+):
+	if rules is None:
+		rules = selection(game)
+
+	faded = {rule.other for rule in rules if isinstance(rule, src.rules.EnPassant)}  # ghosts about to be taken en passant show through
+
+	for area in areas or (screen.get_rect(),):
+		screen.set_clip(area)
+		screen.fill(src.theme.EMPTY)
+		screen.fill(src.theme.DARK,
+			special_flags = pygame.BLEND_RGBA_MULT,
+		)
+
+		for square in src.algebra.Square:
+			if area.colliderect(rect(square)):
+				tile(screen, square)
+
+		screen.blit(Main.GAME.surf, area, area,
+			special_flags = pygame.BLEND_RGBA_MULT,
+		)
+
+		for rule in rules:
+			if area.colliderect(rect(rule)):
+				highlight(screen, rule)
+
+		for piece in game:
+			if piece is not None and area.colliderect(place(piece)):
+				if piece is game.selected:
+					if game.promoted is not None and piece is game.promoted.piece:
+						screen.blit(preview(game.promoted.officer, piece.color), place(piece))
+
+					else:
+						glow(screen, piece)
+
+				else:
+					sprite(screen, piece, 1 if piece in faded else piece.ghost)
+
+		write(screen, text)
+
+	screen.set_clip(None)
+
+def caption(opponent: src.opponent.Opponent) -> str:
+	if not opponent.moves:
+		return ""
+
+	return f"depth {opponent.reached}   {opponent.evaluation}   " + " ".join(map(src.bitboard.notation, opponent.moves))
+
+def write(screen: pygame.Surface, text: str):
+	if not text:
+		return
+
+	screen.blit(font().render(text, True, src.theme.WHITE), (
+		src.theme.SQUARE_OFFSET    // 4,
+		src.theme.BOARD_OFFSET * 5 // 16,
+	))
+
+
+def looks(game: src.engine.Game, selected: list[src.rules.Move]) -> dict[src.algebra.Square, tuple]:  # everything that decides how a square is drawn
+	rules = {rule.target: (rule.highlight_color, *ring(rule)) for rule in selected}
+	faded = {rule.other for rule in selected if isinstance(rule, src.rules.EnPassant)}
+
+	looks = {}
+
+	for square in src.algebra.Square:
+		if (piece := game[square]) is None:
+			look = None
+
+		elif piece is game.selected:
+			look = decal(piece), game.promoted.officer if game.promoted is not None and piece is game.promoted.piece else True
+
+		else:
+			look = decal(piece), 1 if piece in faded else piece.ghost
+
+		looks[square] = look, rules.get(square)
+
+	return looks
+
+@cache
+def area(square: src.algebra.Square) -> pygame.Rect:  # the square and any sprite standing on it
+	return rect(square).unionall([
+		Main.BPIECE.surf.get_rect(center = rect(square).center + PIECE_OFFSET),
+		Main.BPIECE.surf.get_rect(center = rect(square).center + PAWN_OFFSET ),
+	])
+
+
+class Canvas:  # keeps the last frame on screen and repaints only what changed since
+
+	banner = pygame.Rect(0, 0, src.theme.RESOLUTION, src.theme.BOARD_OFFSET * 11 // 12)
+
+
+	def __init__(self, screen: pygame.Surface):
+		self.screen = screen
+
+		self.looks: dict[src.algebra.Square, tuple] = {}
+		self.caption = ""
+
+	def __call__(self, game: src.engine.Game, text: str = "") -> list[pygame.Rect]:
+		rules = selection(game)
+		current = looks(game, rules)
+
+		if self.looks:
+			dirty = [area(square) for square in src.algebra.Square if current[square] != self.looks[square]]
+
+			if text != self.caption:
+				dirty.append(self.banner)
+
+		else:
+			dirty = [self.screen.get_rect()]
+
+		self.looks = current
+		self.caption = text
+
+		if dirty:
+			draw(self.screen, game, *dirty,
+				text = text,
+				rules = rules,
+			)
+
+		return dirty
+
+
+	def reset(self):
+		self.looks = {}
+
+
+def clicked(event: pygame.event.Event, game: src.engine.Game) -> bool:
+	if event.type != pygame.MOUSEBUTTONDOWN or event.button != 1:
+		return False
+
+	if (target := locate(event.pos)) is None:
+		return False
+
+	return game.click(target)